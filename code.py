@@ -1,3 +1,17 @@
-from layeredpetalbit import main
+import sys
+
+# Prefer the bytecode from tools/build_mpy.py, the sources in /lib stay as
+# the fallback.
+try:
+    import os
+
+    os.stat("/mpy")
+    sys.path.insert(0, "/mpy")
+except OSError:
+    pass
+
+# Imported first, so the boot time reported on the first frame starts here.
+import board_init  # noqa: E402, F401
+from layeredpetalbit import main  # noqa: E402
 
 main()
@@ -0,0 +1,36 @@
+"""Native :func:`splat.splat` for MicroPython ports with the viper emitter."""
+
+import micropython
+
+
+@micropython.viper
+def splat(buffer, width: int, height: int, x: int, y: int):
+    pixels = ptr8(buffer)  # noqa: F821
+    column = x >> 8
+    row = y >> 8
+    x_fraction = x & 255
+    y_fraction = y & 255
+
+    right = column + 1
+    if right >= width:
+        right = 0
+    below = row + 1
+    if below >= height:
+        below = 0
+    top = row * width
+    bottom = below * width
+
+    weight = ((256 - x_fraction) * (256 - y_fraction)) >> 8
+    if weight > 255:
+        weight = 255
+    if weight > pixels[top + column]:
+        pixels[top + column] = weight
+    weight = (x_fraction * (256 - y_fraction)) >> 8
+    if weight > pixels[top + right]:
+        pixels[top + right] = weight
+    weight = ((256 - x_fraction) * y_fraction) >> 8
+    if weight > pixels[bottom + column]:
+        pixels[bottom + column] = weight
+    weight = (x_fraction * y_fraction) >> 8
+    if weight > pixels[bottom + right]:
+        pixels[bottom + right] = weight
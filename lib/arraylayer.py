@@ -0,0 +1,262 @@
+"""Petal layers simulated with whole-array operations.
+
+:class:`ArrayLayer` keeps the columns of :class:`layeredpetalbit.Layer` in
+``ulab.numpy`` arrays on the device, or NumPy on a host, and runs every
+phase as array operations instead of a loop per petal. Use it for hundreds
+of petals on bigger matrices::
+
+    LayeredPetalDisplay(edge, wind, layer_class=ArrayLayer, petal_capacity=512)
+
+Each petal slot has its own 16 bit xorshift state per phase and all states
+step together, so runs follow :func:`rng.seed` but not the scalar layer's
+sequence. Where petals overlap the brightest one is drawn, the scalar layer
+draws the last one.
+
+"""
+
+import random
+
+try:
+    from ulab import numpy as np
+except ImportError:
+    import numpy as np
+
+import rng
+from composite import Accumulator
+from framebuffer import FrameBuffer
+from layeredpetalbit import DECAY_HIT, Wind
+from petals import Edge, more_blooms
+
+
+def _states(count: int):
+    """Return ``count`` xorshift states seeded from :obj:`rng.default`.
+
+    Each slot's seed is mixed from a seed per call and the slot number, see
+    :func:`rng.mix`. Consecutive draws of one stream would make every slot
+    its neighbour shifted by one step.
+
+    """
+    seed = rng.mix(rng.default.next())
+    return np.array(
+        [rng.mix(seed + slot * rng.GOLDEN) or 1 for slot in range(1, count + 1)],
+        dtype=np.uint16,
+    )
+
+
+def _step(states):
+    """Return the next state of every generator in ``states``."""
+    states = np.bitwise_xor(states, np.left_shift(states, 7))
+    states = np.bitwise_xor(states, np.right_shift(states, 9))
+    return np.bitwise_xor(states, np.left_shift(states, 8))
+
+
+def _uniform(states, low: int, high: int):
+    """Map states to integers in ``[low, high]``."""
+    return np.array(low + states * ((high - low + 1) / 65536), dtype=np.int16)
+
+
+class ArrayLayer:
+    """Petals stored as array columns, updated a whole column at a time.
+
+    Takes the same arguments as :class:`layeredpetalbit.Layer`, except that
+    gravity always comes from the edge.
+
+    Args:
+        capacity: Maximum number of live petals, extra blooms are skipped.
+
+    """
+
+    def __init__(
+        self,
+        edge: Edge,
+        wind: Wind,
+        bloom_chance: float = 0.5,
+        capacity: int = 64,
+        petal_brightness_max: int = 255,
+        petal_brightness_min: int = 10,
+        petal_decay_rate_max: int = 10,
+        petal_drift_chance: float = 0.5,
+        petals_per_bloom_max: int = 1,
+        field=None,
+    ):
+        if field is not None:
+            raise ValueError("ArrayLayer does not support a vector field")
+
+        self.edge: Edge = edge
+        self.wind: Wind = wind
+
+        self.bloom_chance: float = bloom_chance
+
+        assert 0 <= petal_brightness_min <= petal_brightness_max <= 255, (
+            "Petal brightness must be 0 <= petal_brightness_min="
+            f"{petal_brightness_min} <= petal_brightness_max="
+            f"{petal_brightness_max} <= 255"
+        )
+        self.petal_brightness_min: int = petal_brightness_min
+        self.petal_brightness_max: int = petal_brightness_max
+
+        self.petal_decay_rate_max: int = petal_decay_rate_max
+        self.petal_drift_chance: float = petal_drift_chance
+        self.petals_per_bloom_max: int = petals_per_bloom_max
+
+        self.capacity: int = capacity
+        self.count: int = 0
+
+        self.x = np.zeros(capacity, dtype=np.int16)
+        self.y = np.zeros(capacity, dtype=np.int16)
+        self.brightness = np.zeros(capacity, dtype=np.int16)
+        self.decay_rate = np.zeros(capacity, dtype=np.int16)
+        self.alive = np.zeros(capacity, dtype=np.uint8)
+
+        self.bloom_states = _states(capacity)
+        self.decay_states = _states(capacity)
+        self.drop_states = _states(capacity)
+        self.wind_states = _states(capacity)
+
+    def _draws(self, name: str, start: int, end: int):
+        """Step a phase's generators for slots ``[start, end)``, return them."""
+        states = getattr(self, name)
+        states[start:end] = _step(states[start:end])
+        return states[start:end]
+
+    def _bytes(self, name: str, count: int):
+        """Return a random byte per live petal from a phase's generators."""
+        return np.right_shift(self._draws(name, 0, count), 8)
+
+    def blooms(self, count: int):
+        """Create up to ``count`` petals, returns how many fit."""
+        count = min(count, self.capacity - self.count)
+        if count < 1:
+            return 0
+
+        start = self.count
+        end = start + count
+        edge = self.edge
+
+        for column, low, high in (
+            (self.x, edge.x_min, edge.x_max),
+            (self.y, edge.y_min, edge.y_max),
+            (self.brightness, self.petal_brightness_min, self.petal_brightness_max),
+            (self.decay_rate, 0, self.petal_decay_rate_max),
+        ):
+            column[start:end] = _uniform(
+                self._draws("bloom_states", start, end), low, high
+            )
+        self.alive[start:end] = 1
+        self.count = end
+        return count
+
+    def bloom(self):
+        """Create a petal in the next free slot.
+
+        Returns:
+            int: Slot of the new petal, ``-1`` when the layer is full.
+
+        """
+        if not self.blooms(1):
+            return -1
+        return self.count - 1
+
+    def clean_petals(self):
+        """Compact live petals to the front, freeing dead slots."""
+        count = self.count
+        keep = self.alive[:count] > 0
+        for column in (self.x, self.y, self.brightness, self.decay_rate):
+            kept = column[:count][keep]
+            column[: len(kept)] = kept
+
+        live = int(np.sum(keep))
+        self.alive[:live] = 1
+        self.alive[live:count] = 0
+        self.count = live
+
+    def draw(self, framebuffer: FrameBuffer):
+        """Scatter petals into the frame buffer, keeping the brightest per pixel.
+
+        An :class:`composite.Accumulator` blends them in its own mode. The
+        scatter itself is a loop over the visible petals, ``ulab`` has no
+        assignment through an array of indices.
+
+        """
+        count = self.count
+        if not count:
+            return
+
+        width = framebuffer.width
+        height = framebuffer.height
+        x = self.x[:count]
+        y = self.y[:count]
+
+        # Petals off any side are gone for good.
+        visible = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        self.alive[:count] = np.where(visible, self.alive[:count], 0)
+        if not np.any(visible):
+            return
+
+        # Unsigned before multiplying, int16 indices wrap past 32767 pixels.
+        rows = np.array(y[visible], dtype=np.uint16)
+        columns = np.array(x[visible], dtype=np.uint16)
+        indices = (rows * width + columns).tolist()
+        brightness = self.brightness[:count][visible].tolist()
+        if isinstance(framebuffer, Accumulator):
+            framebuffer.add(indices, brightness, len(indices))
+            return
+
+        buffer = framebuffer.buffer
+        for index, value in zip(indices, brightness):
+            if value > buffer[index]:
+                buffer[index] = value
+
+    def decay(self):
+        """Fading petals."""
+        count = self.count
+        hits = self._bytes("decay_states", count) < DECAY_HIT
+
+        brightness = self.brightness[:count]
+        faded = np.maximum(brightness - self.decay_rate[:count], 0)
+        self.brightness[:count] = np.where(hits, faded, brightness)
+        # Only ever kills, a petal culled by draw stays dead.
+        self.alive[:count] = np.where(hits & (faded == 0), 0, self.alive[:count])
+
+    def drop(self):
+        """Apply gravity to petals."""
+        count = self.count
+        falls = self._bytes("drop_states", count) >= rng.threshold(
+            self.petal_drift_chance
+        )
+        gravity_x = self.edge.dx
+        gravity_y = self.edge.dy
+        if gravity_x:
+            self.x[:count] = self.x[:count] + np.where(falls, gravity_x, 0)
+        if gravity_y:
+            self.y[:count] = self.y[:count] + np.where(falls, gravity_y, 0)
+
+    def generate_blooms(self):
+        """Create more petals."""
+        if not more_blooms(chance=self.bloom_chance):
+            return
+
+        self.blooms(random.randint(0, self.petals_per_bloom_max))
+
+    def gust(self):
+        """Blow petals."""
+        wind = self.wind
+        if not wind.start():
+            return
+
+        count = self.count
+        blown = self._bytes("wind_states", count) >= rng.threshold(
+            wind.gust_miss_chance
+        )
+        column = self.x if wind.blows_x() else self.y
+        column[:count] = column[:count] + np.where(blown, wind.gust_strength, 0)
+
+    def tick(self, framebuffer: FrameBuffer, gust: bool = False):
+        """Run one frame: draw, decay, drop, compact, bloom and maybe gust."""
+        self.draw(framebuffer)
+        self.decay()
+        self.drop()
+        self.clean_petals()
+        self.generate_blooms()
+        if gust:
+            self.gust()
@@ -0,0 +1,110 @@
+"""Play looping animations from the IS31FL3731 frame memory.
+
+Frames are rendered once into an :class:`Animation`, uploaded to the chip
+and played by its auto play mode, so the MCU and the bus stay idle. Loops
+longer than the chip's eight frames are streamed in halves: one half plays
+while the next chunk is written to the other.
+
+"""
+
+from time import monotonic, sleep
+
+from displays import adapt
+from framebuffer import FrameBuffer
+
+FRAMES = 8
+# Auto play frame delays in milliseconds, the driver divides by 11.
+DELAY_MIN = 11
+DELAY_MAX = 64 * 11
+
+
+class Animation:
+    """A loop of frames for the chip to play.
+
+    Args:
+        display: Display adapter with ``supports_autoplay``, or a driver
+            :func:`displays.adapt` turns into one, e.g. ``ScrollPhatHD``.
+        delay: Milliseconds each frame is shown, at least :data:`DELAY_MIN`.
+
+    """
+
+    def __init__(self, display, delay: int = 100):
+        if delay < DELAY_MIN:
+            raise ValueError(f"Delay must be at least {DELAY_MIN} ms")
+        self.display = adapt(display)
+        if not self.display.supports_autoplay:
+            raise ValueError("Display cannot auto play")
+        self.delay: int = delay
+        self.frames: list[bytes] = []
+        self.blinks: list[bytes] = []
+
+    def add(self, framebuffer: FrameBuffer, blink=None):
+        """Append a copy of the frame buffer, with optional blink pixels."""
+        self.frames.append(bytes(framebuffer.buffer))
+        self.blinks.append(None if blink is None else bytes(blink))
+
+    def sequence(self):
+        """Return ``(frames, blinks, delay)`` with delays the chip supports.
+
+        Frames longer than the chip allows are repeated.
+
+        """
+        repeat = -(-self.delay // DELAY_MAX)
+        frames = [frame for frame in self.frames for _ in range(repeat)]
+        blinks = [blink for blink in self.blinks for _ in range(repeat)]
+        return frames, blinks, self.delay // repeat
+
+    def _upload(self, frames: list, blinks: list, first: int):
+        display = self.display
+        for offset, frame in enumerate(frames):
+            display.blit(frame)
+            display.write_frame(first + offset, blink=blinks[offset])
+
+    def _start(self, first: int, count: int, delay: int, loops: int = 0):
+        self.display.autoplay(
+            delay=delay, loops=loops, frames=count % FRAMES, first=first
+        )
+
+    def play(self):
+        """Upload and loop the animation on the chip.
+
+        Returns:
+            bool: :obj:`False` when the loop does not fit in the chip and has
+            to be streamed with :meth:`run`.
+
+        """
+        frames, blinks, delay = self.sequence()
+        if len(frames) > FRAMES:
+            return False
+
+        self._upload(frames, blinks, 0)
+        self._start(0, len(frames), delay)
+        return True
+
+    def run(self):
+        """Play the animation forever, streaming it when it is too long."""
+        if self.play():
+            while True:
+                sleep(60)
+
+        frames, blinks, delay = self.sequence()
+        half = FRAMES // 2
+        chunks = [
+            (frames[start : start + half], blinks[start : start + half])
+            for start in range(0, len(frames), half)
+        ]
+
+        first = 0
+        self._upload(*chunks[0], first)
+        while True:
+            for number in range(len(chunks)):
+                chunk_frames, _ = chunks[number]
+                started = monotonic()
+                self._start(first, len(chunk_frames), delay, loops=1)
+
+                # Fill the other half while this one plays.
+                first = half - first
+                self._upload(*chunks[(number + 1) % len(chunks)], first)
+
+                duration = len(chunk_frames) * delay / 1000
+                sleep(max(0, duration - (monotonic() - started)))
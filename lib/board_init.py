@@ -0,0 +1,54 @@
+"""Bring up only the CLUE hardware the animations use.
+
+``from adafruit_clue import clue`` loads drivers for every sensor on the
+board, which costs boot time and heap when all an animation needs is the
+I2C bus to the display and maybe the two buttons. :func:`i2c` and
+:func:`buttons` create just those, on first use.
+
+Import this module first in ``code.py``: :func:`first_frame` then reports
+how long it took from there to the first frame shown.
+
+"""
+
+from scheduler import ticks_diff, ticks_ms
+
+started_ms: int = ticks_ms()
+
+_i2c = None
+
+
+def i2c():
+    """Return the board's I2C bus, created once."""
+    global _i2c
+    if _i2c is None:
+        import board
+
+        _i2c = board.I2C()
+    return _i2c
+
+
+def buttons():
+    """Return ``(read_a, read_b)``, each :obj:`True` while its button is pressed.
+
+    Made to be passed to :class:`runtime.Button`.
+
+    """
+    import board
+    from digitalio import DigitalInOut, Direction, Pull
+
+    reads = []
+    for pin in (board.BUTTON_A, board.BUTTON_B):
+        button = DigitalInOut(pin)
+        button.direction = Direction.INPUT
+        button.pull = Pull.UP
+        reads.append(lambda button=button: not button.value)
+    return tuple(reads)
+
+
+def first_frame():
+    """Print the time from start up to now, on the first call only."""
+    global started_ms
+    if started_ms is None:
+        return
+    print("First frame after", ticks_diff(ticks_ms(), started_ms), "ms")
+    started_ms = None
@@ -0,0 +1,144 @@
+"""One frame buffer spread over several panels.
+
+A :class:`TiledCanvas` is drawn like a single large display and cut into a
+frame buffer per :class:`Panel` on :meth:`TiledCanvas.show`. Panels whose
+pixels did not change are skipped. Panels on different I2C buses can be
+written at the same time from a thread pool, on hosts that have threads::
+
+    canvas = TiledCanvas.row([ScrollPhatHD(i2c, address=0x74),
+                              ScrollPhatHD(i2c, address=0x75)])
+    edge = Edge(width=canvas.width, height=canvas.height)
+    ...
+    layered_petal_display.draw(canvas.framebuffer)
+    canvas.show()
+
+"""
+
+from displays import Adapter, adapt
+from framebuffer import FrameBuffer
+
+
+class Panel:
+    """A display showing the window of a canvas at ``(x, y)``.
+
+    The display is driven by its adapter from :func:`displays.adapt`.
+
+    Args:
+        display: Panel driver or display adapter.
+        x: Canvas column of the panel's left edge.
+        y: Canvas row of the panel's top edge.
+        table: Optional brightness lookup, see :class:`framebuffer.FrameBuffer`.
+
+    """
+
+    def __init__(self, display, x: int = 0, y: int = 0, table=None):
+        self.display = display
+        self.output = adapt(display, table=table)
+        self.x: int = x
+        self.y: int = y
+
+        self.width: int = self.output.width
+        self.height: int = self.output.height
+        self.framebuffer: FrameBuffer = self.output.framebuffer
+        self.bus = self.output.bus
+
+        self.shows: int = 0
+        self.skips: int = 0
+
+    def crop(self, canvas: FrameBuffer):
+        """Copy the panel's window of the canvas.
+
+        Returns:
+            bool: :obj:`True` when any pixel changed since the last copy.
+
+        """
+        source = canvas.buffer
+        target = self.framebuffer.buffer
+        canvas_width = canvas.width
+        width = self.width
+
+        changed = False
+        index = 0
+        for row in range(self.y, self.y + self.height):
+            start = row * canvas_width + self.x
+            for offset in range(start, start + width):
+                value = source[offset]
+                if target[index] != value:
+                    target[index] = value
+                    changed = True
+                index += 1
+        return changed
+
+    def show(self):
+        self.output.show()
+        self.shows += 1
+
+
+def _show_panels(panels: list):
+    for panel in panels:
+        panel.show()
+
+
+class TiledCanvas(Adapter):
+    """Frame buffer covering a set of panels, itself a display adapter.
+
+    Args:
+        panels: Panels, each placed at its own ``(x, y)``.
+        threads: Write panels on different buses from a thread pool.
+            Needs :mod:`concurrent.futures`, i.e. CPython.
+
+    """
+
+    def __init__(self, panels: list, threads: bool = False):
+        self.panels: list[Panel] = panels
+        self.width: int = max(panel.x + panel.width for panel in panels)
+        self.height: int = max(panel.y + panel.height for panel in panels)
+        self.framebuffer: FrameBuffer = FrameBuffer(self.width, self.height)
+
+        self._buses: dict = {}
+        for panel in panels:
+            self._buses.setdefault(id(panel.bus), []).append(panel)
+
+        self._executor = None
+        if threads and len(self._buses) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(max_workers=len(self._buses))
+
+    @classmethod
+    def row(cls, displays: list, table=None, threads: bool = False):
+        """Place displays side by side, left to right."""
+        panels = []
+        x = 0
+        for display in displays:
+            panel = Panel(display, x=x, table=table)
+            panels.append(panel)
+            x += panel.width
+        return cls(panels, threads=threads)
+
+    def show(self):
+        """Update every panel whose window changed."""
+        if self._executor is None:
+            for panel in self.panels:
+                if panel.crop(self.framebuffer):
+                    panel.show()
+                else:
+                    panel.skips += 1
+            return
+
+        changed = []
+        for panels in self._buses.values():
+            dirty = []
+            for panel in panels:
+                if panel.crop(self.framebuffer):
+                    dirty.append(panel)
+                else:
+                    panel.skips += 1
+            if dirty:
+                changed.append(dirty)
+
+        # One job per bus, so writes on a bus stay in order.
+        for future in [
+            self._executor.submit(_show_panels, dirty) for dirty in changed
+        ]:
+            future.result()
@@ -0,0 +1,103 @@
+"""Blend overlapping petals into a 16 bit buffer, then write each pixel once.
+
+Drawing straight into a :class:`framebuffer.FrameBuffer` lets the last
+write to a pixel win, so what shows depends on the order of the writes.
+An :class:`Accumulator` keeps 8.8 fixed point sums instead and blends every
+value into what is there:
+
+- :data:`MAX`: the brightest value wins, whatever the order.
+- :data:`ADD`: values add up, saturating at full brightness.
+- :data:`ALPHA`: each value is laid over what is there at a fixed opacity.
+
+:meth:`Accumulator.resolve` then quantizes the frame into the frame buffer,
+optionally through a lookup table, and the display writes each pixel once::
+
+    accumulator = Accumulator(17, 7, mode=ADD)
+    accumulator.clear()
+    for layer in layers:
+        layer.draw(accumulator)
+    accumulator.resolve(output.framebuffer)
+    output.show()
+
+Drawers collect the pixel indices and values of a pass and hand them over
+in one :meth:`Accumulator.add` call.
+
+"""
+
+from array import array
+
+MAX = "max"
+ADD = "add"
+ALPHA = "alpha"
+
+MODES = (MAX, ADD, ALPHA)
+
+_FULL = 0xFFFF
+
+
+class Accumulator:
+    """Per-pixel 8.8 fixed point brightness for one frame.
+
+    Args:
+        width: Pixels per row.
+        height: Number of rows.
+        mode: One of :data:`MODES`.
+        alpha: Opacity of each value in :data:`ALPHA` mode, ``256`` is opaque.
+
+    """
+
+    __slots__ = ("width", "height", "mode", "alpha", "buffer")
+
+    def __init__(self, width: int, height: int, mode: str = MAX, alpha: int = 128):
+        if mode not in MODES:
+            raise ValueError(f"Unknown blend mode {mode!r}")
+        self.width: int = width
+        self.height: int = height
+        self.mode: str = mode
+        self.alpha: int = alpha
+        self.buffer: array = array("H", [0] * (width * height))
+
+    def clear(self):
+        buffer = self.buffer
+        for index in range(len(buffer)):
+            buffer[index] = 0
+
+    def add(self, indices, values, count: int):
+        """Blend ``values[i]`` (0-255) into pixel ``indices[i]``, for ``i < count``."""
+        buffer = self.buffer
+        mode = self.mode
+        if mode == MAX:
+            for item in range(count):
+                index = indices[item]
+                value = values[item] << 8
+                if value > buffer[index]:
+                    buffer[index] = value
+        elif mode == ADD:
+            for item in range(count):
+                index = indices[item]
+                value = buffer[index] + (values[item] << 8)
+                buffer[index] = value if value < _FULL else _FULL
+        else:
+            alpha = self.alpha
+            for item in range(count):
+                index = indices[item]
+                old = buffer[index]
+                buffer[index] = old + (((values[item] << 8) - old) * alpha >> 8)
+
+    def resolve(self, framebuffer, table=None):
+        """Quantize into the frame buffer's bytes, through ``table`` if given.
+
+        Args:
+            framebuffer: :class:`framebuffer.FrameBuffer` of the same size.
+            table: Optional 256 byte lookup, e.g. a curve that compresses
+                the highlights of :data:`ADD`.
+
+        """
+        buffer = self.buffer
+        target = framebuffer.buffer
+        if table is None:
+            for index in range(len(buffer)):
+                target[index] = buffer[index] >> 8
+        else:
+            for index in range(len(buffer)):
+                target[index] = table[buffer[index] >> 8]
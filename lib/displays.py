@@ -0,0 +1,193 @@
+"""One interface to every display the animations run on.
+
+Animations draw into :attr:`framebuffer` of a display adapter and call
+:meth:`show`, or copy finished frames in with :meth:`blit` and
+:meth:`blit_rows`. How the pixels reach the hardware is up to the adapter:
+
+- :class:`IS31Display` for IS31FL3731 drivers, e.g. ``ScrollPhatHD``,
+  writes only the registers that changed into alternating chip frames.
+- :class:`PicoScrollDisplay` for ``picoscroll.PicoScroll`` hands over the
+  whole image in one call.
+
+:func:`adapt` picks the adapter for a driver::
+
+    output = adapt(scroll_phat_hd(), table=BrightnessTable())
+    layered_petal_display.draw(output.framebuffer)
+    output.show()
+
+Capability flags tell what else a display can do:
+
+- ``supports_hardware_frames``: :meth:`IS31Display.write_frame` and
+  :meth:`IS31Display.show_frame` use the chip's own frame memory.
+- ``supports_autoplay``: the chip plays an :class:`autoplay.Animation` by
+  itself, through :meth:`IS31Display.autoplay`.
+- ``supports_blink``: :meth:`IS31Display.write_frame` takes blinking pixels
+  and :meth:`IS31Display.blink` sets their rate.
+
+"""
+
+from framebuffer import FrameBuffer, PingPongRenderer
+
+
+class Adapter:
+    """What every display adapter shares.
+
+    Subclasses set up :attr:`framebuffer` and define ``show``.
+
+    """
+
+    supports_hardware_frames: bool = False
+    supports_autoplay: bool = False
+    supports_blink: bool = False
+
+    framebuffer: FrameBuffer
+
+    def blit(self, buffer):
+        """Copy a whole frame of brightness bytes, shown on :meth:`show`."""
+        self.framebuffer.buffer[:] = buffer
+
+    def blit_rows(self, buffer, first: int, last: int):
+        """Copy rows ``[first, last)`` of a whole frame, shown on :meth:`show`."""
+        self.framebuffer.copy_rows(buffer, first, last)
+
+
+class IS31Display(Adapter):
+    """IS31FL3731 display shown through a :class:`PingPongRenderer`.
+
+    Args:
+        display: IS31FL3731 driver, e.g. ``ScrollPhatHD``.
+        table: Optional brightness lookup, see :class:`framebuffer.FrameBuffer`.
+        frames: Chip frames :meth:`show` alternates between.
+
+    """
+
+    supports_hardware_frames: bool = True
+    supports_autoplay: bool = True
+    supports_blink: bool = True
+
+    def __init__(self, display, table=None, frames: tuple = (0, 1)):
+        self.display = display
+        self.width: int = display.width
+        self.height: int = display.height
+        self.framebuffer: FrameBuffer = FrameBuffer(
+            self.width, self.height, table=table
+        )
+        self.renderer: PingPongRenderer = PingPongRenderer(
+            display, self.framebuffer, frames=frames
+        )
+
+        device = display.i2c_device
+        self.bus = getattr(device, "i2c", device)
+
+    def show(self):
+        self.renderer.show()
+
+    def write_frame(self, frame: int, blink=None):
+        """Write the frame buffer to a chip frame without showing it.
+
+        Args:
+            frame: Chip frame to write.
+            blink: Optional buffer of the same size, non-zero pixels blink.
+
+        """
+        self.framebuffer.blit(self.display, frame=frame, blink=blink)
+
+        # Keep the renderer's copy of the frame, so :meth:`show` still
+        # writes only what changed.
+        renderer = self.renderer
+        if frame in renderer.frames:
+            colors = self.framebuffer._colors
+            shadow = renderer.shadows[renderer.frames.index(frame)]
+            shadow[:] = memoryview(colors)[1:]
+
+    def show_frame(self, frame: int):
+        """Show a chip frame written before."""
+        self.display.frame(frame, show=True)
+
+    def autoplay(self, delay: int = 0, loops: int = 0, frames: int = 0, first=None):
+        """Let the chip play its frames, see the driver's ``autoplay``.
+
+        Args:
+            delay: Milliseconds per frame, ``0`` stops auto play.
+            loops: Times to play, ``0`` plays forever.
+            frames: Frames to play, ``0`` plays all eight.
+            first: Chip frame to start from, by default the current one.
+
+        """
+        if first is not None:
+            self.display.frame(first, show=False)
+        self.display.autoplay(delay=delay, loops=loops, frames=frames)
+
+    def blink(self, rate: int = None):
+        """Set the blink period in milliseconds, ``0`` stops blinking.
+
+        Returns the period without a ``rate``.
+
+        """
+        return self.display.blink(rate)
+
+
+class PicoScrollDisplay(Adapter):
+    """Pico Scroll, or a display with its methods.
+
+    The frame buffer goes through the brightness table into one image that
+    is handed to ``set_pixels``; drivers without it get one ``set_pixel``
+    per lit pixel.
+
+    Args:
+        scroll: Pico Scroll.
+        table: Optional brightness lookup, see :class:`framebuffer.FrameBuffer`.
+
+    """
+
+    def __init__(self, scroll, table=None):
+        self.display = scroll
+        self.width: int = scroll.get_width()
+        self.height: int = scroll.get_height()
+        self.framebuffer: FrameBuffer = FrameBuffer(
+            self.width, self.height, table=table
+        )
+        self.bus = scroll
+
+        self._image: bytearray = bytearray(self.width * self.height)
+        self._set_pixels = getattr(scroll, "set_pixels", None)
+
+    def show(self):
+        scroll = self.display
+        framebuffer = self.framebuffer
+        buffer = framebuffer.buffer
+        image = self._image
+
+        if framebuffer.table is None:
+            image[:] = buffer
+        else:
+            table = framebuffer.table.table
+            for index in range(len(buffer)):
+                image[index] = table[buffer[index]]
+
+        if self._set_pixels is not None:
+            self._set_pixels(image)
+        else:
+            width = self.width
+            scroll.clear()
+            for index in range(len(image)):
+                if image[index]:
+                    scroll.set_pixel(index % width, index // width, image[index])
+        scroll.show()
+
+
+def adapt(display, table=None):
+    """Return the adapter for a display driver, adapters are returned as is."""
+    if hasattr(display, "blit_rows"):
+        return display
+    if hasattr(display, "i2c_device"):
+        return IS31Display(display, table=table)
+    return PicoScrollDisplay(display, table=table)
+
+
+def scroll_phat_hd():
+    """Create the Scroll pHAT HD driver on the CLUE I2C bus."""
+    from adafruit_is31fl3731.scroll_phat_hd import ScrollPhatHD
+    from board_init import i2c
+
+    return ScrollPhatHD(i2c())
@@ -0,0 +1,208 @@
+"""Gravity and wind as a grid of steps, looked up per petal.
+
+A :class:`VectorField` holds one ``(dx, dy)`` step per pixel: gravity at
+any angle plus gusts that vary across the display. A dropping petal reads
+the two steps of its cell, so every petal costs the same however the field
+is made up.
+
+Steps are whole pixels. The fraction of each cell's vector is spread over
+neighbouring cells with an ordered dither, so a petal passing through them
+moves at the field's angle on average. Gusts come from a coarse lattice of
+values that wander a little every time the whole grid has been redone, and
+:meth:`VectorField.step` redoes a few rows per frame, so the field costs a
+fixed amount per frame as well::
+
+    field = VectorField(17, 7, gravity_angle=60, wind_angle=0)
+    edge = Edge(17, 7, side=upwind_side(60))
+
+Angles are in degrees: 0 points along +x, 90 along +y, down the display.
+
+"""
+
+import math
+from array import array
+
+import rng
+from petals import Edge
+
+ONE = 256  # 1.0 in 8.8 fixed point.
+
+# Steps are stored as signed bytes, the dither adds up to one pixel.
+STEP_MAX = 126
+
+# 4x4 Bayer matrix as thresholds in [0, 256), averaging one half.
+_DITHER = bytes(
+    level * 16 + 8
+    for level in (0, 8, 2, 10, 12, 4, 14, 6, 3, 11, 1, 9, 15, 7, 13, 5)
+)
+
+
+def vector(angle: float, length: float = 1.0):
+    """Return ``(x, y)`` of ``angle`` and ``length`` in 8.8 fixed point."""
+    radians = math.radians(angle)
+    return (
+        int(round(math.cos(radians) * length * ONE)),
+        int(round(math.sin(radians) * length * ONE)),
+    )
+
+
+def upwind_side(angle: float):
+    """Return the :class:`petals.Edge` side gravity at ``angle`` pulls away from."""
+    quadrant = int(((angle % 360) + 45) // 90) % 4
+    return (Edge.left, Edge.top, Edge.right, Edge.bottom)[quadrant]
+
+
+class VectorField:
+    """Steps per pixel from gravity and gusts.
+
+    Args:
+        width: Pixels per row.
+        height: Number of rows.
+        gravity_angle: Direction gravity pulls.
+        gravity: Pixels gravity moves a petal per drop.
+        wind_angle: Direction gusts push.
+        gust_strength_max: Pixels the strongest gust adds per drop.
+        gust_cell: Pixels between gust lattice points, smaller varies more.
+        gust_change: How far a lattice value wanders per refresh, up to 256.
+        rows_per_step: Rows :meth:`step` recomputes.
+
+    Raises:
+        ValueError: When ``gravity`` and ``gust_strength_max`` together
+            exceed :data:`STEP_MAX` pixels.
+
+    Attributes:
+        x: Step along x of each pixel, row major.
+        y: Step along y of each pixel, row major.
+
+    """
+
+    __slots__ = (
+        "width",
+        "height",
+        "gravity_x",
+        "gravity_y",
+        "wind_x",
+        "wind_y",
+        "gust_scale",
+        "gust_cell",
+        "gust_change",
+        "rows_per_step",
+        "lattice_width",
+        "gusts",
+        "stream",
+        "x",
+        "y",
+        "row",
+        "phase",
+    )
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        gravity_angle: float = 90.0,
+        gravity: float = 1.0,
+        wind_angle: float = 0.0,
+        gust_strength_max: float = 1.0,
+        gust_cell: int = 4,
+        gust_change: int = 32,
+        rows_per_step: int = 1,
+    ):
+        if abs(gravity) + abs(gust_strength_max) > STEP_MAX:
+            raise ValueError(
+                f"Gravity and gusts move more than {STEP_MAX} pixels per drop"
+            )
+        self.width: int = width
+        self.height: int = height
+        self.gravity_x, self.gravity_y = vector(gravity_angle, gravity)
+        self.wind_x, self.wind_y = vector(wind_angle)
+        self.gust_scale: int = int(gust_strength_max * ONE)
+        self.gust_cell: int = gust_cell
+        self.gust_change: int = gust_change
+        self.rows_per_step: int = rows_per_step
+
+        # A lattice point past the last pixel, to interpolate towards.
+        self.lattice_width: int = width // gust_cell + 2
+        lattice_height = height // gust_cell + 2
+        self.stream = rng.stream()
+        self.gusts: array = array(
+            "h",
+            [
+                self.stream.randint(-ONE, ONE)
+                for _ in range(self.lattice_width * lattice_height)
+            ],
+        )
+
+        self.x: array = array("b", bytes(width * height))
+        self.y: array = array("b", bytes(width * height))
+        self.row: int = 0
+        self.phase: int = 0
+        for row in range(height):
+            self._compute_row(row)
+
+    def cell(self, x: int, y: int):
+        """Return the index of the cell at ``(x, y)``, clamped to the grid."""
+        if x < 0:
+            x = 0
+        elif x >= self.width:
+            x = self.width - 1
+        if y < 0:
+            y = 0
+        elif y >= self.height:
+            y = self.height - 1
+        return y * self.width + x
+
+    def step(self):
+        """Recompute the next rows, the gusts move on after the last row."""
+        for _ in range(self.rows_per_step):
+            self._compute_row(self.row)
+            self.row += 1
+            if self.row >= self.height:
+                self.row = 0
+                self._wander()
+
+    def _wander(self):
+        """Move every gust lattice value a little and shift the dither."""
+        gusts = self.gusts
+        change = self.gust_change
+        stream = self.stream
+        for index in range(len(gusts)):
+            value = gusts[index] + stream.randint(-change, change)
+            gusts[index] = min(max(value, -ONE), ONE)
+        self.phase = (self.phase + 5) & 15
+
+    def _compute_row(self, row: int):
+        width = self.width
+        cell_size = self.gust_cell
+        gusts = self.gusts
+        gust_scale = self.gust_scale
+        gravity_x = self.gravity_x
+        gravity_y = self.gravity_y
+        wind_x = self.wind_x
+        wind_y = self.wind_y
+        steps_x = self.x
+        steps_y = self.y
+
+        top = (row // cell_size) * self.lattice_width
+        bottom = top + self.lattice_width
+        y_fraction = (row % cell_size) * ONE // cell_size
+        dither_row = ((row + (self.phase >> 2)) & 3) * 4
+        phase = self.phase & 3
+
+        index = row * width
+        for column in range(width):
+            left = column // cell_size
+            x_fraction = (column % cell_size) * ONE // cell_size
+
+            # Bilinear gust in [-ONE, ONE] from the four lattice points around.
+            upper = gusts[top + left]
+            upper += (gusts[top + left + 1] - upper) * x_fraction >> 8
+            lower = gusts[bottom + left]
+            lower += (gusts[bottom + left + 1] - lower) * x_fraction >> 8
+            gust = (upper + ((lower - upper) * y_fraction >> 8)) * gust_scale >> 8
+
+            threshold = _DITHER[dither_row + ((column + phase) & 3)]
+            steps_x[index] = (gravity_x + (wind_x * gust >> 8) + threshold) >> 8
+            # The flipped threshold keeps the y dither apart from the x one.
+            steps_y[index] = (gravity_y + (wind_y * gust >> 8) + (threshold ^ 128)) >> 8
+            index += 1
@@ -0,0 +1,196 @@
+"""Render into memory, then push whole frames to the IS31FL3731."""
+
+_BANK_ADDRESS = 0xFD
+_BLINK_OFFSET = 0x12
+_COLOR_OFFSET = 0x24
+
+_LEDS = 144  # 16x9 LED registers per frame on the chip.
+
+
+class FrameBuffer:
+    """One brightness byte per pixel, row major.
+
+    Args:
+        width: Pixels per row.
+        height: Number of rows.
+        table: Optional 256 entry lookup, e.g. :class:`lut.BrightnessTable`,
+            applied when the buffer is written to the chip.
+
+    """
+
+    def __init__(self, width: int, height: int, table=None):
+        self.width: int = width
+        self.height: int = height
+        self.buffer: bytearray = bytearray(width * height)
+        self.table = table
+
+        # Register images with the start address in front, ready to write.
+        self._colors: bytearray = bytearray(1 + _LEDS)
+        self._colors[0] = _COLOR_OFFSET
+        self._blinks: bytearray = bytearray(1 + _LEDS // 8)
+        self._blinks[0] = _BLINK_OFFSET
+
+        self._addresses: bytearray = None
+
+    def fill(self, color: int = 0):
+        """Set every pixel to ``color``."""
+        buffer = self.buffer
+        for index in range(len(buffer)):
+            buffer[index] = color
+
+    def copy_rows(self, buffer, first: int, last: int):
+        """Copy rows ``[first, last)`` of a whole frame of the same size."""
+        start = first * self.width
+        end = last * self.width
+        self.buffer[start:end] = memoryview(buffer)[start:end]
+
+    def pixel(self, x: int, y: int, color: int = None):
+        """Set or return a pixel, coordinates outside the buffer are ignored."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        if color is None:
+            return self.buffer[y * self.width + x]
+        self.buffer[y * self.width + x] = color
+        return None
+
+    def addresses(self, display):
+        """Return chip LED address of every pixel, cached after first use."""
+        if self._addresses is None:
+            self._addresses = bytearray(
+                display.pixel_addr(x, y)
+                for y in range(self.height)
+                for x in range(self.width)
+            )
+        return self._addresses
+
+    def registers(self, display):
+        """Return the colour register image, address byte first."""
+        addresses = self.addresses(display)
+        buffer = self.buffer
+        colors = self._colors
+        if self.table is None:
+            for index in range(len(buffer)):
+                colors[1 + addresses[index]] = buffer[index]
+        else:
+            table = self.table.table
+            for index in range(len(buffer)):
+                colors[1 + addresses[index]] = table[buffer[index]]
+        return colors
+
+    def blit(self, display, frame: int = 0, blink=None):
+        """Write the whole buffer to a chip frame in one burst.
+
+        Args:
+            display: IS31FL3731 driver, e.g. ``ScrollPhatHD``.
+            frame: Chip frame to write, it is not shown.
+            blink: Optional buffer of the same size, non-zero pixels blink.
+
+        """
+        colors = self.registers(display)
+
+        display._bank(int(frame))
+        with display.i2c_device as i2c:
+            i2c.write(colors)
+
+            if blink is None:
+                return
+
+            addresses = self._addresses
+            blinks = self._blinks
+            for index in range(1, len(blinks)):
+                blinks[index] = 0
+            for index in range(len(self.buffer)):
+                if blink[index]:
+                    address = addresses[index]
+                    blinks[1 + (address >> 3)] |= 1 << (address & 7)
+            i2c.write(blinks)
+
+
+class PingPongRenderer:
+    """Alternate chip frames, writing only registers that changed.
+
+    Every chip frame remembers what was last written to it. On :meth:`show`
+    the frame buffer is compared with the frame about to be shown and only
+    the runs of changed registers are sent.
+
+    Args:
+        display: IS31FL3731 driver, e.g. ``ScrollPhatHD``.
+        framebuffer: Frame buffer to show.
+        frames: Chip frames to alternate between.
+        gap: Unchanged registers to rewrite rather than start a new write.
+
+    """
+
+    def __init__(
+        self,
+        display,
+        framebuffer: FrameBuffer,
+        frames: tuple = (0, 1),
+        gap: int = 4,
+    ):
+        self.display = display
+        self.framebuffer: FrameBuffer = framebuffer
+        self.frames: tuple = frames
+        self.gap: int = gap
+
+        # Chip frames are cleared when the driver starts.
+        self.shadows: list[bytearray] = [bytearray(_LEDS) for _ in frames]
+        self.current: int = 0
+
+        self._bank: bytearray = bytearray((_BANK_ADDRESS, 0))
+
+        self.changed_pixels: int = 0
+        self.runs: int = 0
+        self.total_changed_pixels: int = 0
+        self.total_runs: int = 0
+
+    def show(self):
+        """Update the next chip frame from the frame buffer and show it."""
+        display = self.display
+        frame = self.frames[self.current]
+        shadow = self.shadows[self.current]
+        colors = self.framebuffer.registers(display)
+        gap = self.gap
+
+        changed_pixels = 0
+        runs = 0
+        run_start = -1
+        run_end = 0
+
+        with display.i2c_device as i2c:
+            for address in range(_LEDS + gap + 1):
+                if address < _LEDS and colors[1 + address] != shadow[address]:
+                    shadow[address] = colors[1 + address]
+                    changed_pixels += 1
+                    if run_start < 0:
+                        run_start = address
+                    run_end = address + 1
+                elif run_start >= 0 and address - run_end >= gap:
+                    if not runs:
+                        # Select the bank while holding the bus lock.
+                        self._bank[1] = frame
+                        i2c.write(self._bank)
+                    self._write_run(i2c, colors, run_start, run_end)
+                    runs += 1
+                    run_start = -1
+
+        display.frame(frame, show=True)
+        self.current = (self.current + 1) % len(self.frames)
+
+        self.changed_pixels = changed_pixels
+        self.runs = runs
+        self.total_changed_pixels += changed_pixels
+        self.total_runs += runs
+
+    @staticmethod
+    def _write_run(i2c, colors: bytearray, start: int, end: int):
+        """Write registers ``[start, end)`` from the register image.
+
+        The byte in front of the run temporarily holds its start address, so
+        no buffer is allocated.
+
+        """
+        saved = colors[start]
+        colors[start] = _COLOR_OFFSET + start
+        i2c.write(colors, start=start, end=end + 1)
+        colors[start] = saved
@@ -0,0 +1,472 @@
+"""In-memory displays for running the animations off-device.
+
+:class:`HeadlessDisplay` stands in for ``ScrollPhatHD`` and emulates the
+IS31FL3731 register file, so the per-pixel driver calls, frame buffer blits
+and dirty-run writes all land in the same place and their bus traffic is
+counted. :class:`HeadlessPicoScroll` stands in for ``picoscroll.PicoScroll``.
+
+Shown frames can be recorded and dumped to a NumPy array, PNG files or an
+animated GIF.
+
+"""
+
+_MODE_REGISTER = 0x00
+_FRAME_REGISTER = 0x01
+_AUTOPLAY1_REGISTER = 0x02
+_AUTOPLAY2_REGISTER = 0x03
+_BLINK_REGISTER = 0x05
+_SHUTDOWN_REGISTER = 0x0A
+
+_CONFIG_BANK = 0x0B
+_BANK_ADDRESS = 0xFD
+
+_PICTURE_MODE = 0x00
+_AUTOPLAY_MODE = 0x08
+
+_BLINK_OFFSET = 0x12
+_COLOR_OFFSET = 0x24
+
+_FRAMES = 8
+_FRAME_REGISTERS = 0xB4
+_CONFIG_REGISTERS = 0x0D
+
+WIDTH = 17
+HEIGHT = 7
+
+
+class _Recorder:
+    """Keep copies of shown frames, taken with the subclass's ``snapshot``."""
+
+    width: int = WIDTH
+    height: int = HEIGHT
+
+    def __init__(self, record: bool = False):
+        self.record: bool = record
+        self.frames: list[bytes] = []
+
+    def _record(self, frame: int = None):
+        if self.record:
+            self.frames.append(bytes(self.snapshot(frame)))
+
+    def to_array(self):
+        """Return recorded frames as a ``(frames, height, width)`` array."""
+        import numpy
+
+        return numpy.frombuffer(b"".join(self.frames), dtype=numpy.uint8).reshape(
+            (len(self.frames), self.height, self.width)
+        )
+
+    def save_png(self, path: str, frame: bytes = None, scale: int = 1):
+        """Write a frame, the current one by default, as a greyscale PNG."""
+        if frame is None:
+            frame = self.snapshot()
+        write_png(path, frame, self.width, self.height, scale=scale)
+
+    def save_pngs(self, directory: str, prefix: str = "frame", scale: int = 1):
+        """Write every recorded frame as ``<prefix>_<number>.png``."""
+        import os
+
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for number, frame in enumerate(self.frames):
+            path = os.path.join(directory, f"{prefix}_{number:05d}.png")
+            self.save_png(path, frame=frame, scale=scale)
+            paths.append(path)
+        return paths
+
+    def save_gif(self, path: str, scale: int = 1, delay_ms: int = 100):
+        """Write every recorded frame into one looping greyscale GIF."""
+        write_gif(path, self.frames, self.width, self.height, scale, delay_ms)
+
+
+class HeadlessBus:
+    """I2C device stand-in that applies writes to a :class:`HeadlessDisplay`.
+
+    Counts transactions and bytes so render cost can be compared.
+
+    """
+
+    def __init__(self, display: "HeadlessDisplay"):
+        self.display: HeadlessDisplay = display
+        self.writes: int = 0
+        self.bytes_written: int = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, buffer, *, start: int = 0, end: int = None):
+        if end is None:
+            end = len(buffer)
+        self.writes += 1
+        self.bytes_written += end - start
+        self.display._write(buffer, start, end)
+
+    def write_then_readinto(self, out_buffer, in_buffer):
+        self.writes += 1
+        self.bytes_written += len(out_buffer)
+        self.display._read(out_buffer[0], in_buffer)
+
+
+class HeadlessDisplay(_Recorder):
+    """IS31FL3731 with Scroll pHAT HD addressing, held in memory.
+
+    Args:
+        width: Pixels per row.
+        height: Number of rows.
+        record: Keep a copy of every frame that is shown.
+
+    """
+
+    def __init__(self, width: int = WIDTH, height: int = HEIGHT, record: bool = False):
+        super().__init__(record=record)
+        self.width: int = width
+        self.height: int = height
+
+        self.i2c_device: HeadlessBus = HeadlessBus(self)
+        self.banks: list[bytearray] = [
+            bytearray(_FRAME_REGISTERS) for _ in range(_FRAMES)
+        ]
+        self.config: bytearray = bytearray(_CONFIG_REGISTERS)
+        self.selected_bank: int = 0
+
+        self._frame: int = 0
+
+    @staticmethod
+    def pixel_addr(x: int, y: int):
+        if x <= 8:
+            x = 8 - x
+            y = 6 - y
+        else:
+            x = x - 8
+            y = y - 8
+        return x * 16 + y
+
+    def _write(self, buffer, start: int, end: int):
+        register = buffer[start]
+        data = buffer[start + 1 : end]
+        if register == _BANK_ADDRESS:
+            self.selected_bank = data[0]
+            return
+
+        if self.selected_bank == _CONFIG_BANK:
+            self.config[register : register + len(data)] = data
+            if register <= _FRAME_REGISTER < register + len(data):
+                self._record()
+            if (
+                register <= _MODE_REGISTER < register + len(data)
+                and self.config[_MODE_REGISTER] & _AUTOPLAY_MODE
+            ):
+                for frame in self.autoplay_frames():
+                    self._record(frame)
+        else:
+            bank = self.banks[self.selected_bank]
+            bank[register : register + len(data)] = data
+
+    def _read(self, register: int, buffer):
+        if register == _BANK_ADDRESS:
+            buffer[0] = self.selected_bank
+            return
+        if self.selected_bank == _CONFIG_BANK:
+            registers = self.config
+        else:
+            registers = self.banks[self.selected_bank]
+        for index in range(len(buffer)):
+            buffer[index] = registers[register + index]
+
+    def _i2c_write_reg(self, register: int, data):
+        with self.i2c_device as i2c:
+            i2c.write(bytes((register,)) + bytes(data))
+
+    def _bank(self, bank: int = None):
+        if bank is None:
+            return self.selected_bank
+        self._i2c_write_reg(_BANK_ADDRESS, (bank,))
+        return None
+
+    def _register(self, bank: int, register: int, value: int = None):
+        self._bank(bank)
+        if value is None:
+            result = bytearray(1)
+            with self.i2c_device as i2c:
+                i2c.write_then_readinto(bytes((register,)), result)
+            return result[0]
+        self._i2c_write_reg(register, (value,))
+        return None
+
+    def sleep(self, value: bool):
+        return self._register(_CONFIG_BANK, _SHUTDOWN_REGISTER, 0 if value else 1)
+
+    def frame(self, frame: int = None, show: bool = True):
+        if frame is None:
+            return self._frame
+        frame = int(frame)
+        if not 0 <= frame < _FRAMES:
+            raise ValueError("Frame out of range")
+        self._frame = frame
+        if show:
+            self._register(_CONFIG_BANK, _FRAME_REGISTER, frame)
+        return None
+
+    def autoplay(self, delay: int = 0, loops: int = 0, frames: int = 0):
+        if delay == 0:
+            self._register(_CONFIG_BANK, _MODE_REGISTER, _PICTURE_MODE)
+            return
+        delay //= 11
+        if not 0 <= loops <= 7:
+            raise ValueError("Loops out of range")
+        if not 0 <= frames <= 7:
+            raise ValueError("Frames out of range")
+        if not 1 <= delay <= 64:
+            raise ValueError("Delay out of range")
+        self._register(_CONFIG_BANK, _AUTOPLAY1_REGISTER, loops << 4 | frames)
+        self._register(_CONFIG_BANK, _AUTOPLAY2_REGISTER, delay % 64)
+        self._register(_CONFIG_BANK, _MODE_REGISTER, _AUTOPLAY_MODE | self._frame)
+
+    def autoplay_frames(self):
+        """Return the chip frames one auto play loop shows, in order."""
+        first = self.config[_MODE_REGISTER] & 0x07
+        count = (self.config[_AUTOPLAY1_REGISTER] & 0x07) or _FRAMES
+        return [(first + offset) % _FRAMES for offset in range(count)]
+
+    def blink(self, rate: int = None):
+        if rate is None:
+            return (self._register(_CONFIG_BANK, _BLINK_REGISTER) & 0x07) * 270
+        if rate == 0:
+            self._register(_CONFIG_BANK, _BLINK_REGISTER, 0x00)
+            return None
+        self._register(_CONFIG_BANK, _BLINK_REGISTER, (rate // 270) & 0x07 | 0x08)
+        return None
+
+    def fill(self, color: int = None, frame: int = None, blink: bool = False):
+        if frame is None:
+            frame = self._frame
+        self._bank(int(frame))
+        if color is not None:
+            if not 0 <= color <= 255:
+                raise ValueError("Color out of range")
+            data = bytearray([color] * 25)
+            with self.i2c_device as i2c:
+                for row in range(6):
+                    data[0] = _COLOR_OFFSET + row * 24
+                    i2c.write(data)
+        if blink is not None:
+            data = bool(blink) * 0xFF
+            for column in range(18):
+                self._register(frame, _BLINK_OFFSET + column, data)
+
+    def pixel(
+        self,
+        x: int,
+        y: int,
+        color: int = None,
+        blink: bool = None,
+        frame: int = None,
+    ):
+        if not 0 <= x <= self.width:
+            return None
+        if not 0 <= y <= self.height:
+            return None
+        address = self.pixel_addr(x, y)
+        if frame is None:
+            frame = self._frame
+        frame = int(frame)
+        if color is None and blink is None:
+            return self._register(frame, _COLOR_OFFSET + address)
+        if color is not None:
+            if not 0 <= color <= 255:
+                raise ValueError("Color out of range")
+            self._register(frame, _COLOR_OFFSET + address, color)
+        if blink is not None:
+            register, bit = divmod(address, 8)
+            bits = self._register(frame, _BLINK_OFFSET + register)
+            if blink:
+                bits |= 1 << bit
+            else:
+                bits &= ~(1 << bit)
+            self._register(frame, _BLINK_OFFSET + register, bits)
+        return None
+
+    def shown_frame(self):
+        """Return the chip frame currently on the LEDs."""
+        return self.config[_FRAME_REGISTER] & 0x07
+
+    def snapshot(self, frame: int = None):
+        """Return a chip frame, the shown one by default, in pixel order."""
+        if frame is None:
+            frame = self.shown_frame()
+        bank = self.banks[frame]
+        return bytearray(
+            bank[_COLOR_OFFSET + self.pixel_addr(x, y)]
+            for y in range(self.height)
+            for x in range(self.width)
+        )
+
+
+class HeadlessPicoScroll(_Recorder):
+    """``picoscroll.PicoScroll`` held in memory.
+
+    Buttons are pressed and released from the host with :meth:`press` and
+    :meth:`release`.
+
+    """
+
+    BUTTON_A = 12
+    BUTTON_B = 13
+    BUTTON_X = 14
+    BUTTON_Y = 15
+
+    def __init__(self, width: int = WIDTH, height: int = HEIGHT, record: bool = False):
+        super().__init__(record=record)
+        self.width: int = width
+        self.height: int = height
+
+        self.pixels: bytearray = bytearray(width * height)
+        self.shown: bytearray = bytearray(width * height)
+        self.pressed: set = set()
+        self.text: str = ""
+
+    def get_width(self):
+        return self.width
+
+    def get_height(self):
+        return self.height
+
+    def set_pixel(self, x: int, y: int, brightness: int):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise ValueError("x or y out of range.")
+        if not 0 <= brightness <= 255:
+            raise ValueError("brightness out of range.")
+        self.pixels[y * self.width + x] = brightness
+
+    def set_pixels(self, image):
+        self.pixels[:] = image
+
+    def clear(self):
+        for index in range(len(self.pixels)):
+            self.pixels[index] = 0
+
+    def show_text(self, text: str, brightness: int, offset: int = 0):
+        """Remember the text, glyphs are not rendered."""
+        self.text = text
+
+    def show(self):
+        self.shown[:] = self.pixels
+        self._record()
+
+    def is_pressed(self, button: int):
+        return button in self.pressed
+
+    def press(self, button: int):
+        self.pressed.add(button)
+
+    def release(self, button: int):
+        self.pressed.discard(button)
+
+    def snapshot(self, frame: int = None):
+        return self.shown
+
+
+def _scaled(pixels, width: int, height: int, scale: int):
+    """Return pixels in row order with every pixel ``scale`` times as big."""
+    scaled = bytearray()
+    for y in range(height):
+        row = bytearray()
+        for x in range(width):
+            row.extend(bytes((pixels[y * width + x],)) * scale)
+        scaled.extend(bytes(row) * scale)
+    return scaled
+
+
+def write_png(path: str, pixels, width: int, height: int, scale: int = 1):
+    """Write greyscale pixels, one byte each in row order, as a PNG file."""
+    import struct
+    import zlib
+
+    scaled = _scaled(pixels, width, height, scale)
+    stride = width * scale
+    raw = bytearray()
+    for start in range(0, len(scaled), stride):
+        raw.append(0)  # No filter.
+        raw.extend(scaled[start : start + stride])
+
+    def chunk(kind: bytes, data: bytes):
+        body = kind + data
+        return (
+            struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+        )
+
+    header = struct.pack(">IIBBBBB", width * scale, height * scale, 8, 0, 0, 0, 0)
+    with open(path, "wb") as png:
+        png.write(b"\x89PNG\r\n\x1a\n")
+        png.write(chunk(b"IHDR", header))
+        png.write(chunk(b"IDAT", zlib.compress(bytes(raw))))
+        png.write(chunk(b"IEND", b""))
+
+
+def write_gif(
+    path: str,
+    frames: list,
+    width: int,
+    height: int,
+    scale: int = 1,
+    delay_ms: int = 100,
+):
+    """Write greyscale frames, one byte per pixel in row order, as a looping GIF.
+
+    The image data is stored without compression, as 9 bit literal codes with
+    a clear code before the decoder's table would grow, so no LZW encoder is
+    needed.
+
+    """
+    import struct
+
+    width *= scale
+    height *= scale
+    palette = bytes(value for grey in range(256) for value in (grey, grey, grey))
+
+    with open(path, "wb") as gif:
+        gif.write(b"GIF89a")
+        gif.write(struct.pack("<HHBBB", width, height, 0xF7, 0, 0))
+        gif.write(palette)
+        # Loop forever.
+        gif.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+        for frame in frames:
+            pixels = _scaled(frame, width // scale, height // scale, scale)
+            gif.write(
+                struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 0, delay_ms // 10, 0, 0)
+            )
+            gif.write(struct.pack("<BHHHHB", 0x2C, 0, 0, width, height, 0))
+            gif.write(b"\x08")  # Minimum code size.
+
+            data = bytearray()
+            bits = 0
+            count = 0
+            for code in _literal_codes(pixels):
+                bits |= code << count
+                count += 9
+                while count >= 8:
+                    data.append(bits & 0xFF)
+                    bits >>= 8
+                    count -= 8
+            if count:
+                data.append(bits)
+
+            for start in range(0, len(data), 255):
+                block = data[start : start + 255]
+                gif.write(bytes((len(block),)) + block)
+            gif.write(b"\x00")
+
+        gif.write(b"\x3b")
+
+
+def _literal_codes(pixels):
+    clear = 256
+    for index, value in enumerate(pixels):
+        if index % 250 == 0:
+            yield clear
+        yield value
+    yield clear + 1  # End of information.
@@ -1,233 +1,276 @@
-from time import sleep
-from adafruit_clue import clue
-from adafruit_is31fl3731.scroll_phat_hd import ScrollPhatHD as Display
-
-
-display = Display(clue._i2c)
-
-def charge():
-    frame_0 = """
-    11011111101111101
-    10011110101111011
-    10111110001110001
-    11111110101111011
-    11111110111110111
-    11111111111111111
-    11111111111111111
-    """
-    frame_1 = """
-    11111111111111111
-    11111111111111111
-    11111111111111111
-    11111111111111111
-    11111111111111111
-    11111111111111111
-    11111111111111111
-    """
-
-    display.frame(0, show=False)
-    for i_row, row in enumerate(frame_0.split()):
-        for i_column, column in enumerate(row):
-            display.pixel(i_column, i_row, 0 if column == "0" else 100)
-    display.frame(1, show=False)
-    for i_row, row in enumerate(frame_1.split()):
-        for i_column, column in enumerate(row):
-            display.pixel(i_column, i_row, 0 if column == "0" else 100)
-
-    while True:
-        display.frame(0, show=True)
-        sleep(1)
-        display.frame(1, show=True)
-        sleep(1)
-
-
-def wave():
+from autoplay import Animation
+from board_init import first_frame
+from displays import adapt, scroll_phat_hd
+from framebuffer import FrameBuffer
+from scheduler import FrameScheduler
+from sprite import Sprite
+
+
+CHARGE_FRAMES = (
+    Sprite(17, (
+        0b11011111101111101,
+        0b10011110101111011,
+        0b10111110001110001,
+        0b11111110101111011,
+        0b11111110111110111,
+        0b11111111111111111,
+        0b11111111111111111,
+    )),
+    Sprite(17, (
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+    )),
+)
+
+PLUS = Sprite(17, (
+    0b00000000000000000,
+    0b00000000000000000,
+    0b00000000100000000,
+    0b00000001110000000,
+    0b00000000100000000,
+    0b00000000000000000,
+    0b00000000000000000,
+))
+
+HEART = Sprite(17, (
+    0b00000000000000000,
+    0b00000001010000000,
+    0b00000011111000000,
+    0b00000011111000000,
+    0b00000001110000000,
+    0b00000000100000000,
+    0b00000000000000000,
+))
+
+TRANSITION_FRAMES = (
+    Sprite(17, (
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+    )),
+    Sprite(17, (
+        0b00000000000000000,
+        0b00000000000000000,
+        0b00000000100000000,
+        0b00000001110000000,
+        0b00000000100000000,
+        0b00000000000000000,
+        0b00000000000000000,
+    )),
+    Sprite(17, (
+        0b00000000000000000,
+        0b00000001110000000,
+        0b00000011111000000,
+        0b00000011111000000,
+        0b00000011111000000,
+        0b00000001110000000,
+        0b00000000000000000,
+    )),
+    Sprite(17, (
+        0b00000011111000000,
+        0b00000111111100000,
+        0b00001111111110000,
+        0b00001111111110000,
+        0b00001111111110000,
+        0b00000111111100000,
+        0b00000011111000000,
+    )),
+    Sprite(17, (
+        0b00001111111110000,
+        0b00011111111111000,
+        0b00111111111111100,
+        0b00111111111111100,
+        0b00111111111111100,
+        0b00011111111111000,
+        0b00001111111110000,
+    )),
+    Sprite(17, (
+        0b00111111111111100,
+        0b01111111111111110,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b01111111111111110,
+        0b00111111111111100,
+    )),
+    Sprite(17, (
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+        0b11111111111111111,
+    )),
+)
+
+
+def charge(display):
+    output = adapt(display)
+    framebuffer = FrameBuffer(output.width, output.height)
+    animation = Animation(output, delay=1000)
+    for sprite in CHARGE_FRAMES:
+        framebuffer.fill(0)
+        sprite.blit(framebuffer, 100)
+        animation.add(framebuffer)
+
+    animation.run()
+
+
+def wave(display, delay=100):
+    # Rendered once, the chip plays it from here on.
+    wave_animation(display, delay=delay).run()
+
+
+def wave_animation(display, delay=100):
+    """Return the frames of :func:`wave` as an :class:`Animation`."""
     sweep = [ 1, 2, 3, 4, 6, 8, 10, 15, 20, 30, 40, 60,
         60, 40, 30, 20, 15, 10, 8, 6, 4, 3, 2, 1, ]
 
-    frame = 0
-
-    display.blink(1000)
-    while True:
-        for incr in range(24):
-            display.frame(frame, show=False)
+    output = adapt(display)
+    framebuffer = FrameBuffer(output.width, output.height)
+    buffer = framebuffer.buffer
+    blinks = bytearray(len(buffer))
+    animation = Animation(output, delay=delay)
 
-            for row in range(display.height):
-                for column in range(display.width):
-                    # brightness = column * row
-                    brightness = sweep[(row+column+incr) % 24]
-                    display.pixel(column, row, brightness, blink=brightness == 60)
-                    # sleep(0.1)
+    output.blink(1000)
+    for incr in range(24):
+        index = 0
+        for row in range(output.height):
+            for column in range(output.width):
+                # brightness = column * row
+                brightness = sweep[(row+column+incr) % 24]
+                buffer[index] = brightness
+                blinks[index] = brightness == 60
+                index += 1
+                # sleep(0.1)
 
-            display.frame(frame, show=True)
-            frame = not frame
+        animation.add(framebuffer, blink=blinks)
 
+    return animation
 
-def pattern_to_tuples(pattern: str):
-    """Return list of (row, column) coordinates of lit pixels.
 
-    Pattern should be a grid of 0 or 1 characters.
+async def choose_brightness(display, button_a, button_b):
+    """Dim or brighten the display with two :class:`runtime.Button`.
 
-        00000000000000000
-        00000001010000000
-        00000001010000000
-        00000000000000000
-        00000001010000000
-        00000000100000000
-        00000000000000000
+    Holding a button changes the brightness, on release a transition plays
+    in its own task and stops when a button is pressed again. The display
+    needs ``supports_hardware_frames``, see :mod:`displays`.
 
     """
-    coordinates = []
-    for row_i, row in enumerate(pattern.split()):
-        for column_i, column in enumerate(row):
-            if column == "1":
-                coordinates.append((row_i, column_i))
-    return coordinates
-
-def choose_brightness():
+    from runtime import asyncio
+
+    output = adapt(display)
+    framebuffer = output.framebuffer
     brightness = 10
+    shown_brightness = brightness
     step = 5
 
-    pattern_plus = pattern_to_tuples("""
-        00000000000000000
-        00000000000000000
-        00000000100000000
-        00000001110000000
-        00000000100000000
-        00000000000000000
-        00000000000000000
-    """)
-    # pattern_plus = ((2,9), (3,8), (3,9), (3,10), (4,9))
-    pattern_heart = pattern_to_tuples("""
-        00000000000000000
-        00000001010000000
-        00000011111000000
-        00000011111000000
-        00000001110000000
-        00000000100000000
-        00000000000000000
-    """)
-    pattern = pattern_heart
-
-    transition_frames = (
-        pattern_to_tuples("""
-        11111111111111111
-        11111111111111111
-        11111111111111111
-        11111111111111111
-        11111111111111111
-        11111111111111111
-        11111111111111111
-        """),
-        pattern_to_tuples("""
-        00000000000000000
-        00000000000000000
-        00000000100000000
-        00000001110000000
-        00000000100000000
-        00000000000000000
-        00000000000000000
-        """),
-        pattern_to_tuples("""
-        00000000000000000
-        00000001110000000
-        00000011111000000
-        00000011111000000
-        00000011111000000
-        00000001110000000
-        00000000000000000
-        """),
-        pattern_to_tuples("""
-        00000011111000000
-        00000111111100000
-        00001111111110000
-        00001111111110000
-        00001111111110000
-        00000111111100000
-        00000011111000000
-        """),
-        pattern_to_tuples("""
-        00001111111110000
-        00011111111111000
-        00111111111111100
-        00111111111111100
-        00111111111111100
-        00011111111111000
-        00001111111110000
-        """),
-        pattern_to_tuples("""
-        00111111111111100
-        01111111111111110
-        11111111111111111
-        11111111111111111
-        11111111111111111
-        01111111111111110
-        00111111111111100
-        """),
-        pattern_to_tuples("""
-        11111111111111111
-        11111111111111111
-        11111111111111111
-        11111111111111111
-        11111111111111111
-        11111111111111111
-        11111111111111111
-        """),
-    )
+    pattern = HEART
+    transition_frames = FrameScheduler(frames_per_second=20)
+    held_frames = FrameScheduler(frames_per_second=10)
+    changed = asyncio.Event()
 
-    def transition(old_brightness=0, brightness=0):
+    def pressed():
+        return button_a.pressed or button_b.pressed
+
+    async def transition(old_brightness=0, brightness=0):
         # print(f"Transition to {old_brightness} -> {brightness}")
 
         step = (brightness - old_brightness) // 5
         current_brightness = old_brightness + step
         # steps = tuple(range(old_brightness+step, brightness+1, step))
 
-        for frame, transition_frame in enumerate(transition_frames[1:], start=1):
+        for frame, transition_frame in enumerate(TRANSITION_FRAMES[1:], start=1):
             # print(f"{frame=} {current_brightness=}")
-            display.frame(frame, show=False)
-            display.fill(old_brightness, frame)
-
-            for row, column in transition_frame:
-                display.pixel(column, row, current_brightness)
+            framebuffer.fill(old_brightness)
+            transition_frame.blit(framebuffer, current_brightness)
+            output.write_frame(frame)
             # current_brightness = max(min(current_brightness + step, 255), 0)
             current_brightness = brightness
 
+        transition_frames.reset()
         for frame in range(1, 7):
-            sleep(0.05)
-            display.frame(frame)
+            await transition_frames.wait_async()
+            if pressed():
+                return False
+            output.show_frame(frame)
 
-        display.frame(0, show=False)
-        display.fill(brightness)
+        framebuffer.fill(brightness)
+        output.write_frame(0)
         # print(f"{brightness=}")
+        return True
 
-    def button_held(pressed_func, brightness=0, brightness_step=0):
+    async def button_held(button, brightness_step=0):
+        nonlocal brightness
         _step = brightness_step
 
-        while pressed_func():
+        held_frames.reset()
+        while button.pressed:
             change = brightness + _step
             brightness = min(max(change, 0), 255)
 
-            display.frame(0, show=False)
-            for row, column in pattern:
-                display.pixel(column, row, brightness)
-            display.frame(0, show=True)
+            pattern.blit(framebuffer, brightness)
+            output.write_frame(0)
+            output.show_frame(0)
 
             _step += brightness_step
-            sleep(0.1)
-
-        return brightness
-
-    display.fill(brightness)
-
-    while True:
-        old_brightness = brightness
-
-        brightness = button_held(lambda: clue.button_a, brightness=brightness, brightness_step=-step)
-        brightness = button_held(lambda: clue.button_b, brightness=brightness, brightness_step=step)
-
-        if old_brightness != brightness:
-            transition(old_brightness=old_brightness, brightness=brightness)
+            await held_frames.wait_async()
+
+    async def adjust():
+        while True:
+            await button_held(button_a, brightness_step=-step)
+            await button_held(button_b, brightness_step=step)
+
+            if shown_brightness != brightness and not pressed():
+                changed.set()
+
+            await asyncio.sleep(0.02)
+
+    async def transitions():
+        nonlocal shown_brightness
+        while True:
+            await changed.wait()
+            changed.clear()
+            target = brightness
+            if target == shown_brightness:
+                continue
+            if await transition(old_brightness=shown_brightness, brightness=target):
+                shown_brightness = target
+
+    framebuffer.fill(brightness)
+    output.write_frame(0)
+    first_frame()
+
+    await asyncio.gather(adjust(), transitions())
+
+
+def main(display=None):
+    """Choose brightness with the CLUE buttons, on the Scroll pHAT HD unless a display is given."""
+    from board_init import buttons
+    from runtime import Button, run
+
+    if display is None:
+        display = scroll_phat_hd()
+
+    read_a, read_b = buttons()
+    button_a = Button(read_a)
+    button_b = Button(read_b)
+    run(
+        button_a.watch(),
+        button_b.watch(),
+        choose_brightness(display, button_a, button_b),
+    )
 
-        sleep(0.3)
 
-choose_brightness()
+if __name__ == "__main__":
+    main()
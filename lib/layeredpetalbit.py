@@ -1,76 +1,20 @@
 """Drifting petals in the wind."""
 
 import random
-from time import sleep
+from array import array
 
-from adafruit_clue import clue
-from adafruit_is31fl3731.scroll_phat_hd import ScrollPhatHD as Display
+import rng
+from board_init import first_frame
+from composite import Accumulator
+from displays import adapt, scroll_phat_hd
+from framebuffer import FrameBuffer
+from lut import BrightnessTable
+from petals import Edge, more_blooms
+from rng import XorShift
+from scheduler import FrameScheduler
 
 
-class Petal:
-    def __init__(
-        self, x: int = 0, y: int = 0, brightness: int = 255, decay_rate: int = 1
-    ):
-        self.x: int = x
-        self.y: int = y
-        self.brightness: int = brightness
-        self.decay_rate: int = decay_rate
-
-        self.dead: bool = False
-
-    def decay(self):
-        self.brightness = max(0, self.brightness - self.decay_rate)
-        self.dead = not bool(self.brightness)
-        return self.brightness
-
-    def draw(self, display: Display, frame: int = 0):
-        if (self.x > display.width) or (self.y > display.height):
-            self.dead = True
-            return
-        display.pixel(self.x, self.y, self.brightness, frame=frame)
-
-
-class Edge:
-    top: int = 0
-    bottom: int = 1
-    left: int = 2
-    right: int = 3
-
-    def __init__(self, width: int, height: int, side: int = top):
-        self.side: int = side
-        self.height: int = height
-        self.width: int = width
-
-    def pixel_pen(self):
-        """Return pixel boundaries for selected edge.
-
-        Resulting tuple will be set notation of integers, inclusive.
-
-        - top: x = [0, width], y = [0, 0]
-        - bottom: x = [0, width], y = [height, height]
-        - left: x = [0, 0], y = [0, height]
-        - right: x = [width, width], y = [0, height]
-
-        """
-        if self.side == self.top:
-            return ((0, self.width), (0, 0))
-        elif self.side == self.bottom:
-            return ((0, self.width), (self.height, self.height))
-        elif self.side == self.left:
-            return ((0, 0), (0, self.height))
-        else:  # right
-            return ((self.width, self.width), (0, self.height))
-
-    def apply_gravity(self, x: int, y: int):
-        """Move pixel according to gravity."""
-        if self.side == self.top:
-            return x, y + 1
-        elif self.side == self.bottom:
-            return x, y - 1
-        elif self.side == self.left:
-            return x + 1, y
-        else:  # right
-            return x - 1, y
+DECAY_HIT: int = rng.threshold(0.9)  # Petals fade on most frames.
 
 
 class Wind:
@@ -85,6 +29,17 @@ class Wind:
 
     """
 
+    __slots__ = (
+        "edge",
+        "gust_chance",
+        "gust_duration_max",
+        "gust_miss_chance",
+        "gust_strength_max",
+        "gust_blowing",
+        "gust_strength",
+        "stream",
+    )
+
     def __init__(
         self,
         edge: Edge,
@@ -103,52 +58,104 @@ class Wind:
         self.gust_blowing: int = 0
         self.gust_strength: int = 0
 
-    def blow(self, petals: list[Petal]):
-        """Blow petals to a side."""
-        if random.random() > self.gust_chance:
-            return
+        self.stream: XorShift = rng.stream()
+
+    def start(self):
+        """Decide if the wind blows this frame, creating gusts as needed."""
+        stream = self.stream
+        if not stream.chance(rng.threshold(self.gust_chance)):
+            return False
 
         if self.gust_blowing < 1:
             # Create a gust of wind.
-            self.gust_blowing = random.randint(0, self.gust_duration_max)
-            gust_strengths = list(
-                range(-self.gust_strength_max, self.gust_strength_max + 1)
+            self.gust_blowing = stream.randint(0, self.gust_duration_max)
+            self.gust_strength = stream.randint(
+                -self.gust_strength_max, self.gust_strength_max
             )
-            self.gust_strength = random.choice(gust_strengths)
-
-        for petal in petals:
-            if random.random() < self.gust_miss_chance:
-                continue
-
-            if self.edge.side in (self.edge.top, self.edge.bottom):
-                petal.x += self.gust_strength
-            else:  # left or right
-                petal.y += self.gust_strength
 
         # Gust of wind slowly dies down.
         self.gust_blowing -= 1
+        return True
+
+    def blows_x(self):
+        """Return :obj:`True` when gusts move petals along x."""
+        return self.edge.side in (self.edge.top, self.edge.bottom)
+
+    def blow(self, layer: "Layer"):
+        """Blow petals of a layer to a side."""
+        if not self.start():
+            return
+
+        column = layer.x if self.blows_x() else layer.y
+        miss = rng.threshold(self.gust_miss_chance)
+        draws = self.stream.batch(layer.count)
+
+        for index in range(layer.count):
+            if draws[index] < miss:
+                continue
+
+            column[index] += self.gust_strength
 
 
 class Layer:
+    """Petals stored as preallocated columns.
+
+    Live petals are kept packed in slots ``[0, count)`` so the frame loop
+    never allocates; dead slots are compacted away and reused by new blooms.
+
+    Args:
+        capacity: Maximum number of live petals, extra blooms are skipped.
+        field: Optional :class:`field.VectorField` dropping petals instead
+            of the edge's gravity.
+
+    """
+
+    __slots__ = (
+        "edge",
+        "wind",
+        "bloom_chance",
+        "petal_brightness_min",
+        "petal_brightness_max",
+        "petal_decay_rate_max",
+        "petal_drift_chance",
+        "petals_per_bloom_max",
+        "capacity",
+        "count",
+        "x",
+        "y",
+        "brightness",
+        "decay_rate",
+        "alive",
+        "decay_stream",
+        "drop_stream",
+        "field",
+        "_cells",
+        "_values",
+    )
+
     def __init__(
         self,
         edge: Edge,
         wind: Wind,
         bloom_chance: float = 0.5,
+        capacity: int = 64,
         petal_brightness_max: int = 255,
         petal_brightness_min: int = 10,
         petal_decay_rate_max: int = 10,
         petal_drift_chance: float = 0.5,
         petals_per_bloom_max: int = 1,
-        petals: list[Petal] = None,
+        field: "VectorField" = None,
     ):
         self.edge: Edge = edge
         self.wind: Wind = wind
+        self.field: "VectorField" = field
 
         self.bloom_chance: float = bloom_chance
 
         assert 0 <= petal_brightness_min <= petal_brightness_max <= 255, (
-            f"Petal brightness must be 0 <= {petal_brightness_min=} <= {petal_brightness_max=} <= 255"
+            "Petal brightness must be 0 <= petal_brightness_min="
+            f"{petal_brightness_min} <= petal_brightness_max="
+            f"{petal_brightness_max} <= 255"
         )
         self.petal_brightness_min: int
         self.petal_brightness_max: int
@@ -159,60 +166,286 @@ class Layer:
         self.petal_decay_rate_max: int = petal_decay_rate_max
         self.petal_drift_chance: float = petal_drift_chance
         self.petals_per_bloom_max: int = petals_per_bloom_max
-        self.petals: list[Petal] = petals or []
+
+        self.capacity: int = capacity
+        self.count: int = 0
+
+        self.x: array = array("h", [0] * capacity)
+        self.y: array = array("h", [0] * capacity)
+        self.brightness: bytearray = bytearray(capacity)
+        self.decay_rate: bytearray = bytearray(capacity)
+        self.alive: bytearray = bytearray(capacity)
+
+        # Pixels drawn this frame, blended in one go into an accumulator.
+        self._cells: array = array("H", [0] * capacity)
+        self._values: bytearray = bytearray(capacity)
+
+        # Each phase draws from its own sequence, so the fused tick and the
+        # separate phases make the same choices.
+        self.decay_stream: XorShift = rng.stream(pool_size=capacity)
+        self.drop_stream: XorShift = rng.stream(pool_size=capacity)
 
     def bloom(self):
-        """Create a petal."""
-        x_pen, y_pen = self.edge.pixel_pen()
-        x = random.randint(*x_pen)
-        y = random.randint(*y_pen)
+        """Create a petal in the next free slot.
+
+        Returns:
+            int: Slot of the new petal, ``-1`` when the layer is full.
+
+        """
+        if self.count >= self.capacity:
+            return -1
+
+        edge = self.edge
+        x = random.randint(edge.x_min, edge.x_max)
+        y = random.randint(edge.y_min, edge.y_max)
 
         brightness = random.randint(
             self.petal_brightness_min, self.petal_brightness_max
         )
         decay_rate = random.randint(0, self.petal_decay_rate_max)
-        return Petal(x=x, y=y, brightness=brightness, decay_rate=decay_rate)
+
+        index = self.count
+        self.x[index] = x
+        self.y[index] = y
+        self.brightness[index] = brightness
+        self.decay_rate[index] = decay_rate
+        self.alive[index] = 1
+        self.count += 1
+        return index
 
     def clean_petals(self):
-        """Remove dead petals."""
-        self.petals = [petal for petal in self.petals if not petal.dead]
+        """Compact live petals to the front, freeing dead slots."""
+        alive = self.alive
+        x = self.x
+        y = self.y
+        brightness = self.brightness
+        decay_rate = self.decay_rate
+
+        count = 0
+        for index in range(self.count):
+            if not alive[index]:
+                continue
+
+            if count != index:
+                x[count] = x[index]
+                y[count] = y[index]
+                brightness[count] = brightness[index]
+                decay_rate[count] = decay_rate[index]
+                alive[count] = 1
+            count += 1
+
+        for index in range(count, self.count):
+            alive[index] = 0
+        self.count = count
+
+    def draw(self, framebuffer: FrameBuffer):
+        """Draw petals on dispaly, or blend them into an :class:`Accumulator`."""
+        width = framebuffer.width
+        height = framebuffer.height
+        buffer = framebuffer.buffer
+        x = self.x
+        y = self.y
+        brightness = self.brightness
+        alive = self.alive
+
+        composite = isinstance(framebuffer, Accumulator)
+        cells = self._cells
+        values = self._values
+        drawn = 0
+
+        for index in range(self.count):
+            petal_x = x[index]
+            petal_y = y[index]
+            # Petals off any side are gone for good.
+            if not (0 <= petal_x < width and 0 <= petal_y < height):
+                alive[index] = 0
+                continue
+            if composite:
+                cells[drawn] = petal_y * width + petal_x
+                values[drawn] = brightness[index]
+                drawn += 1
+            else:
+                buffer[petal_y * width + petal_x] = brightness[index]
 
-    def draw(self, display: Display, frame: int = 0):
-        """Draw petals on dispaly."""
-        for petal in self.petals:
-            petal.draw(display, frame=frame)
+        if composite:
+            framebuffer.add(cells, values, drawn)
 
     def decay(self):
         """Fading petals."""
-        for petal in self.petals:
-            if random.random() > 0.9:
+        brightness = self.brightness
+        decay_rate = self.decay_rate
+        alive = self.alive
+        draws = self.decay_stream.batch(self.count)
+
+        for index in range(self.count):
+            if draws[index] >= DECAY_HIT:
                 continue
 
-            petal.decay()
+            brightness[index] = max(0, brightness[index] - decay_rate[index])
+            # Only ever kills, a petal culled by draw stays dead.
+            if not brightness[index]:
+                alive[index] = 0
 
     def drop(self):
         """Apply gravity to petals."""
-        for petal in self.petals:
-            if random.random() < self.petal_drift_chance:
+        x = self.x
+        y = self.y
+        gravity_x = self.edge.dx
+        gravity_y = self.edge.dy
+        field = self.field
+        drift = rng.threshold(self.petal_drift_chance)
+        draws = self.drop_stream.batch(self.count)
+
+        for index in range(self.count):
+            if draws[index] < drift:
                 continue
 
-            petal.x, petal.y = self.edge.apply_gravity(petal.x, petal.y)
+            if field is not None:
+                cell = field.cell(x[index], y[index])
+                gravity_x = field.x[cell]
+                gravity_y = field.y[cell]
+            x[index] += gravity_x
+            y[index] += gravity_y
 
     def generate_blooms(self):
         """Create more petals."""
         if not more_blooms(chance=self.bloom_chance):
             return
 
-        number_of_petals = random.randint(0, self.petals_per_bloom_max)
-        new_petals = [self.bloom() for _ in range(number_of_petals)]
-        self.petals.extend(new_petals)
+        for _ in range(random.randint(0, self.petals_per_bloom_max)):
+            self.bloom()
 
     def gust(self):
         """Blow petals."""
-        self.wind.blow(self.petals)
+        self.wind.blow(self)
+
+    def tick(self, framebuffer: FrameBuffer, gust: bool = False):
+        """Run one frame in a single pass over the petals.
+
+        Draws, decays, drops, blows and compacts each petal in turn, then
+        blooms. Gives the same result as calling :meth:`draw`,
+        :meth:`decay`, :meth:`drop`, :meth:`clean_petals`,
+        :meth:`generate_blooms` and, when ``gust`` is set, :meth:`gust`.
+        Like :meth:`draw` it blends into an :class:`Accumulator`.
+
+        """
+        width = framebuffer.width
+        height = framebuffer.height
+        buffer = framebuffer.buffer
+        x = self.x
+        y = self.y
+        brightness = self.brightness
+        decay_rate = self.decay_rate
+        alive = self.alive
+
+        composite = isinstance(framebuffer, Accumulator)
+        cells = self._cells
+        values = self._values
+        drawn = 0
+
+        decay_draws = self.decay_stream.batch(self.count)
+        drop_draws = self.drop_stream.batch(self.count)
+        drift = rng.threshold(self.petal_drift_chance)
+        gravity_x = self.edge.dx
+        gravity_y = self.edge.dy
+        field = self.field
+
+        wind = self.wind
+        blowing = gust and wind.start()
+        if blowing:
+            # Only survivors use a draw, the rest are given back afterwards.
+            wind_draws = wind.stream.batch(self.count)
+            miss = rng.threshold(wind.gust_miss_chance)
+            blows_x = wind.blows_x()
+            strength = wind.gust_strength
+
+        count = 0
+        for index in range(self.count):
+            petal_x = x[index]
+            petal_y = y[index]
+            petal_brightness = brightness[index]
+            live = 1
+
+            # Draw, petals off any side are gone for good.
+            if not (0 <= petal_x < width and 0 <= petal_y < height):
+                live = 0
+            elif composite:
+                cells[drawn] = petal_y * width + petal_x
+                values[drawn] = petal_brightness
+                drawn += 1
+            else:
+                buffer[petal_y * width + petal_x] = petal_brightness
+
+            # Decay
+            if decay_draws[index] < DECAY_HIT:
+                petal_brightness = max(0, petal_brightness - decay_rate[index])
+                if not petal_brightness:
+                    live = 0
+
+            # Drop
+            if drop_draws[index] >= drift:
+                if field is not None:
+                    cell = field.cell(petal_x, petal_y)
+                    gravity_x = field.x[cell]
+                    gravity_y = field.y[cell]
+                petal_x += gravity_x
+                petal_y += gravity_y
+
+            if not live:
+                continue
+
+            # Gust
+            if blowing and wind_draws[count] >= miss:
+                if blows_x:
+                    petal_x += strength
+                else:
+                    petal_y += strength
+
+            x[count] = petal_x
+            y[count] = petal_y
+            brightness[count] = petal_brightness
+            decay_rate[count] = decay_rate[index]
+            alive[count] = 1
+            count += 1
+
+        for index in range(count, self.count):
+            alive[index] = 0
+        self.count = count
+
+        if composite:
+            framebuffer.add(cells, values, drawn)
+
+        if blowing:
+            wind.stream.give_back(count)
+
+        self.generate_blooms()
+
+        if blowing:
+            column = x if blows_x else y
+            wind_draws = wind.stream.batch(self.count - count)
+            for index in range(count, self.count):
+                if wind_draws[index - count] >= miss:
+                    column[index] += strength
 
 
 class LayeredPetalDisplay:
+    __slots__ = (
+        "edge",
+        "wind",
+        "bloom_chance",
+        "brightness_max",
+        "brightness_min",
+        "num_of_layers",
+        "petal_capacity",
+        "petals_per_bloom_max",
+        "layer_class",
+        "brightness_brackets",
+        "layers",
+        "field",
+        "blend",
+        "accumulator",
+    )
+
     def __init__(
         self,
         edge: Edge,
@@ -221,16 +454,25 @@ class LayeredPetalDisplay:
         brightness_max: int = 255,
         brightness_min: int = 0,
         num_of_layers: int = 1,
+        petal_capacity: int = 64,
         petals_per_bloom_max: int = 2,
+        layer_class: type = Layer,
+        field: "VectorField" = None,
+        blend: str = None,
     ):
         self.edge: Edge = edge
         self.wind: Wind = wind
+        self.field: "VectorField" = field
+        self.blend: str = blend
+        self.accumulator: Accumulator = None
 
         self.bloom_chance: float = bloom_chance
         self.brightness_max: int = brightness_max
         self.brightness_min: int = brightness_min
         self.num_of_layers: int = num_of_layers
+        self.petal_capacity: int = petal_capacity
         self.petals_per_bloom_max: int = petals_per_bloom_max
+        self.layer_class: type = layer_class
 
         self.brightness_brackets = tuple(
             range(
@@ -243,10 +485,10 @@ class LayeredPetalDisplay:
         self.layers: list[Layer] = []
 
     def apply_effect(self, func):
-        """Run function on layers."""
+        """Run function on every live petal as ``func(layer, index)``."""
         for layer in self.layers:
-            for petal in layer.petals:
-                func(petal)
+            for index in range(layer.count):
+                func(layer, index)
 
     def create_layers(self):
         """Set up number of layers with petals."""
@@ -254,16 +496,17 @@ class LayeredPetalDisplay:
             petal_brightness_min = self.brightness_brackets[num]
             petal_brightness_max = self.brightness_brackets[num + 1]
 
-            layer = Layer(
+            layer = self.layer_class(
                 self.edge,
                 self.wind,
                 bloom_chance=self.bloom_chance,
+                capacity=self.petal_capacity,
                 petal_brightness_max=petal_brightness_max,
                 petal_brightness_min=petal_brightness_min,
                 petal_decay_rate_max=10,
                 petal_drift_chance=0.5,
                 petals_per_bloom_max=self.petals_per_bloom_max,
-                petals=[],
+                field=self.field,
             )
             layer.generate_blooms()
 
@@ -271,41 +514,110 @@ class LayeredPetalDisplay:
 
         return self.layers
 
-    def draw(self, display: Display, frame: int = 0):
-        """Draw layers on display."""
-        first_layer, *_ = self.layers
+    def target(self, framebuffer: FrameBuffer):
+        """Return what layers draw into, the cleared accumulator when blending."""
+        if self.blend is None:
+            return framebuffer
+
+        accumulator = self.accumulator
+        if accumulator is None:
+            accumulator = self.accumulator = Accumulator(
+                framebuffer.width, framebuffer.height, mode=self.blend
+            )
+        accumulator.clear()
+        return accumulator
+
+    def draw(self, framebuffer: FrameBuffer):
+        """Draw layers into the frame buffer.
+
+        With a ``blend`` mode the layers are blended into an
+        :class:`composite.Accumulator` first, which then fills the frame
+        buffer.
+
+        """
+        first_layer = self.layers[0]
+        if self.field is not None:
+            self.field.step()
+
+        target = self.target(framebuffer)
+        for layer in self.layers:
+            layer.tick(target, gust=layer is first_layer)
+
+        if target is not framebuffer:
+            target.resolve(framebuffer)
+
+    def draw_profiled(self, framebuffer: FrameBuffer, profiler: "Profiler"):
+        """Draw layers one phase at a time, timing each phase per layer.
+
+        Gives the same frames as :meth:`draw`.
+
+        """
+        first_layer = self.layers[0]
+        if self.field is not None:
+            self.field.step()
+            profiler.mark("field")
 
+        target = self.target(framebuffer)
         for layer in self.layers:
-            layer.draw(display, frame=frame)
+            layer.draw(target)
+            profiler.mark("draw")
             layer.decay()
+            profiler.mark("decay")
             layer.drop()
+            profiler.mark("drop")
             layer.clean_petals()
+            profiler.mark("clean_petals")
             layer.generate_blooms()
-
-            if layer == first_layer:
+            profiler.mark("generate_blooms")
+            if layer is first_layer:
                 layer.gust()
+                profiler.mark("blow")
 
-
-def more_blooms(chance: float = 0.0):
-    """Add more petals when :obj:`True`."""
-    return random.random() > chance
+        if target is not framebuffer:
+            target.resolve(framebuffer)
+            profiler.mark("resolve")
 
 
-def main(
+def create(
+    width: int,
+    height: int,
     bloom_chance: float = 0.3,
-    frames_per_second: int = 10,
     gust_chance: float = 0.7,
     gust_duration_max: int = 10,
     gust_miss_chance: float = 0.3,
     gust_strength_max: int = 3,
     num_of_layers: int = 3,
+    petal_capacity: int = 64,
     petals_per_bloom_max: int = 2,
+    layer_class: type = Layer,
+    gravity_angle: float = None,
+    wind_angle: float = 0.0,
+    field_gust_strength_max: float = 1.0,
+    blend: str = None,
 ):
-    speed = 1 / max(frames_per_second, 1)  # Prevent division by zero / negative
+    """Return the :class:`LayeredPetalDisplay` with layers that :func:`main` runs.
 
-    display = Display(clue._i2c)
+    With ``gravity_angle`` petals fall through a :class:`field.VectorField`
+    at that angle, with gusts along ``wind_angle``, and bloom on the side
+    they fall away from. ``blend`` is a :mod:`composite` mode overlapping
+    petals are blended with, by default the last one drawn shows.
+
+    """
+    field = None
+    side = Edge.top
+    if gravity_angle is not None:
+        from field import VectorField, upwind_side
+
+        field = VectorField(
+            width,
+            height,
+            gravity_angle=gravity_angle,
+            wind_angle=wind_angle,
+            gust_strength_max=field_gust_strength_max,
+        )
+        side = upwind_side(gravity_angle)
 
-    edge = Edge(width=display.width, height=display.height, side=Edge.top)
+    edge = Edge(width=width, height=height, side=side)
 
     wind = Wind(
         edge=edge,
@@ -322,19 +634,107 @@ def main(
         brightness_min=10,
         brightness_max=200,
         num_of_layers=num_of_layers,
+        petal_capacity=petal_capacity,
         petals_per_bloom_max=petals_per_bloom_max,
+        layer_class=layer_class,
+        field=field,
+        blend=blend,
     )
     layered_petal_display.create_layers()
+    return layered_petal_display
 
-    frame = False
 
-    while True:
-        display.frame(frame, show=False)
-        display.fill(0)
+def main(
+    bloom_chance: float = 0.3,
+    brightness: int = 255,
+    frames_per_second: int = 10,
+    gamma: float = 1.0,
+    gust_chance: float = 0.7,
+    gust_duration_max: int = 10,
+    gust_miss_chance: float = 0.3,
+    gust_strength_max: int = 3,
+    num_of_layers: int = 3,
+    petal_capacity: int = 64,
+    petals_per_bloom_max: int = 2,
+    vectorized: bool = False,
+    gravity_angle: float = None,
+    wind_angle: float = 0.0,
+    field_gust_strength_max: float = 1.0,
+    blend: str = None,
+    display=None,
+    panels: list = None,
+    profile: bool = False,
+):
+    """Run the animation, on the Scroll pHAT HD unless a display is given.
+
+    ``panels`` runs one animation over several displays side by side, see
+    :mod:`canvas`. With ``vectorized`` the layers run on ``ulab``/NumPy
+    arrays, see :mod:`arraylayer`. ``gravity_angle`` drops the petals
+    through a vector field and ``blend`` composites overlapping petals, see
+    :func:`create`. With ``profile`` each phase is timed, see
+    :mod:`profiler`.
+
+    """
+    table = BrightnessTable(gamma=gamma, level=brightness)
+    if panels:
+        from canvas import TiledCanvas
+
+        output = TiledCanvas.row(panels, table=table)
+    else:
+        if display is None:
+            display = scroll_phat_hd()
+        output = adapt(display, table=table)
+    framebuffer = output.framebuffer
+
+    layer_class = Layer
+    if vectorized:
+        from arraylayer import ArrayLayer
+
+        layer_class = ArrayLayer
+
+    layered_petal_display = create(
+        framebuffer.width,
+        framebuffer.height,
+        bloom_chance=bloom_chance,
+        gust_chance=gust_chance,
+        gust_duration_max=gust_duration_max,
+        gust_miss_chance=gust_miss_chance,
+        gust_strength_max=gust_strength_max,
+        num_of_layers=num_of_layers,
+        petal_capacity=petal_capacity,
+        petals_per_bloom_max=petals_per_bloom_max,
+        layer_class=layer_class,
+        gravity_angle=gravity_angle,
+        wind_angle=wind_angle,
+        field_gust_strength_max=field_gust_strength_max,
+        blend=blend,
+    )
+
+    scheduler = FrameScheduler(frames_per_second)
+
+    if profile:
+        from profiler import Profiler
+
+        profiler = Profiler()
+        while True:
+            profiler.start()
+            framebuffer.fill(0)
+            profiler.mark("clear")
 
-        layered_petal_display.draw(display, frame=frame)
+            layered_petal_display.draw_profiled(framebuffer, profiler)
+
+            output.show()
+            profiler.mark("render")
+            first_frame()
+            scheduler.wait()
+            if profiler.poll():
+                print(scheduler.summary())
+
+    while True:
+        framebuffer.fill(0)
 
-        display.frame(frame, show=True)
-        sleep(speed)
+        layered_petal_display.draw(framebuffer)
 
-        frame = not frame
+        output.show()
+        first_frame()
+        scheduler.wait()
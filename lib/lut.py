@@ -0,0 +1,47 @@
+"""Brightness lookup tables shared by the renderers.
+
+Renderers index :attr:`BrightnessTable.table` with a 0-255 brightness
+instead of multiplying floats per pixel. The table combines a fixed gamma
+curve with a global dimming level and is only rebuilt when the level
+changes.
+
+"""
+
+
+class BrightnessTable:
+    """256 entry brightness lookup for one display.
+
+    Args:
+        gamma: Gamma curve exponent, ``1.0`` keeps brightness linear and
+            about ``2.2`` looks even to the eye.
+        level: Global level the full brightness maps to.
+        maximum: Largest value the display accepts.
+
+    """
+
+    def __init__(self, gamma: float = 2.2, level: int = 255, maximum: int = 255):
+        self.gamma: float = gamma
+        self.maximum: int = maximum
+
+        self.curve: bytearray = bytearray(
+            int(maximum * (index / 255) ** gamma + 0.5) for index in range(256)
+        )
+        self.table: bytearray = bytearray(256)
+        self.level: int = -1
+        self.set_level(level)
+
+    def set_level(self, level: int):
+        """Dim the table to ``level``, returns :obj:`True` when it changed."""
+        level = min(max(level, 0), 255)
+        if level == self.level:
+            return False
+
+        self.level = level
+        curve = self.curve
+        table = self.table
+        for index in range(256):
+            table[index] = curve[index] * level // 255
+        return True
+
+    def __getitem__(self, brightness: int):
+        return self.table[brightness]
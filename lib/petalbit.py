@@ -1,13 +1,19 @@
 """Drifting petals in the wind."""
 
 import random
-from time import sleep
 
-from adafruit_clue import clue
-from adafruit_is31fl3731.scroll_phat_hd import ScrollPhatHD as Display
+import rng
+from board_init import first_frame
+from displays import adapt, scroll_phat_hd
+from framebuffer import FrameBuffer
+from lut import BrightnessTable
+from petals import Edge, more_blooms
+from scheduler import FrameScheduler
 
 
 class Petal:
+    __slots__ = ("x", "y", "brightness", "decay_rate", "dead")
+
     def __init__(
         self, x: int = 0, y: int = 0, brightness: int = 255, decay_rate: int = 1
     ):
@@ -23,54 +29,11 @@ class Petal:
         self.dead = not bool(self.brightness)
         return self.brightness
 
-    def draw(self, display: Display):
-        if (self.x > display.width) or (self.y > display.height):
+    def draw(self, framebuffer: FrameBuffer):
+        if (self.x > framebuffer.width) or (self.y > framebuffer.height):
             self.dead = True
             return
-        display.pixel(self.x, self.y, self.brightness)
-
-
-class Edge:
-    top: int = 0
-    bottom: int = 1
-    left: int = 2
-    right: int = 3
-
-    def __init__(self, width: int, height: int, side: int = top):
-        self.side: int = side
-        self.height: int = height
-        self.width: int = width
-
-    def pixel_pen(self):
-        """Return pixel boundaries for selected edge.
-
-        Resulting tuple will be set notation of integers, inclusive.
-
-        - top: x = [0, width], y = [0, 0]
-        - bottom: x = [0, width], y = [height, height]
-        - left: x = [0, 0], y = [0, height]
-        - right: x = [width, width], y = [0, height]
-
-        """
-        if self.side == self.top:
-            return ((0, self.width), (0, 0))
-        elif self.side == self.bottom:
-            return ((0, self.width), (self.height, self.height))
-        elif self.side == self.left:
-            return ((0, 0), (0, self.height))
-        else:  # right
-            return ((self.width, self.width), (0, self.height))
-
-    def apply_gravity(self, x: int, y: int):
-        """Move pixel according to gravity."""
-        if self.side == self.top:
-            return x, y + 1
-        elif self.side == self.bottom:
-            return x, y - 1
-        elif self.side == self.left:
-            return x + 1, y
-        else:  # right
-            return x - 1, y
+        framebuffer.pixel(self.x, self.y, self.brightness)
 
 
 class Wind:
@@ -85,6 +48,16 @@ class Wind:
 
     """
 
+    __slots__ = (
+        "edge",
+        "gust_chance",
+        "gust_duration_max",
+        "gust_miss_chance",
+        "gust_strength_max",
+        "gust_blowing",
+        "gust_strength",
+    )
+
     def __init__(
         self,
         edge: Edge,
@@ -103,33 +76,52 @@ class Wind:
         self.gust_blowing: int = 0
         self.gust_strength: int = 0
 
+    def blows_x(self):
+        """Return :obj:`True` when gusts move petals along x."""
+        return self.edge.side in (self.edge.top, self.edge.bottom)
+
     def blow(self, petals: list[Petal]):
         """Blow petals to a side."""
-        if random.random() > self.gust_chance:
+        stream = rng.default
+        if not stream.chance(rng.threshold(self.gust_chance)):
             return
 
         if self.gust_blowing < 1:
             # Create a gust of wind.
-            self.gust_blowing = random.randint(0, self.gust_duration_max)
-            gust_strengths = list(
-                range(-self.gust_strength_max, self.gust_strength_max + 1)
+            self.gust_blowing = stream.randint(0, self.gust_duration_max)
+            self.gust_strength = stream.randint(
+                -self.gust_strength_max, self.gust_strength_max
             )
-            self.gust_strength = random.choice(gust_strengths)
 
-        for petal in petals:
-            if random.random() < self.gust_miss_chance:
+        miss = rng.threshold(self.gust_miss_chance)
+        draws = stream.batch(len(petals))
+        blows_x = self.blows_x()
+        strength = self.gust_strength
+
+        for index, petal in enumerate(petals):
+            if draws[index] < miss:
                 continue
 
-            if self.edge.side in (self.edge.top, self.edge.bottom):
-                petal.x += self.gust_strength
+            if blows_x:
+                petal.x += strength
             else:  # left or right
-                petal.y += self.gust_strength
+                petal.y += strength
 
         # Gust of wind slowly dies down.
         self.gust_blowing -= 1
 
 
 class PetalDisplay:
+    __slots__ = (
+        "edge",
+        "wind",
+        "petal_brightness_max",
+        "petal_brightness_min",
+        "petal_decay_rate_max",
+        "petal_drift_chance",
+        "petal_drift_hit",
+    )
+
     def __init__(
         self,
         edge: Edge,
@@ -146,11 +138,12 @@ class PetalDisplay:
         self.petal_brightness_min: int = petal_brightness_min
         self.petal_decay_rate_max: int = petal_decay_rate_max
         self.petal_drift_chance: float = petal_drift_chance
+        self.petal_drift_hit: int = rng.threshold(petal_drift_chance)
 
     def bloom(self):
-        x_pen, y_pen = self.edge.pixel_pen()
-        x = random.randint(*x_pen)
-        y = random.randint(*y_pen)
+        edge = self.edge
+        x = random.randint(edge.x_min, edge.x_max)
+        y = random.randint(edge.y_min, edge.y_max)
 
         return Petal(
             x=x,
@@ -163,31 +156,38 @@ class PetalDisplay:
 
     def drop(self, petal: Petal):
         """Apply gravity to petal."""
-        if random.random() < self.petal_drift_chance:
+        if rng.default.chance(self.petal_drift_hit):
             return
 
-        petal.x, petal.y = self.edge.apply_gravity(petal.x, petal.y)
+        petal.x += self.edge.dx
+        petal.y += self.edge.dy
 
     def gust(self, petals: list[Petal]):
         """Blow petals to a side."""
         self.wind.blow(petals)
 
 
-def more_blooms(chance: float = 0.0):
-    """Add more petals when :obj:`True`."""
-    return random.random() > chance
-
-
 def main(
     frames_per_second: int = 10,
     bloom_chance: float = 0.3,
     petals_per_bloom_max: int = 3,
+    brightness: int = 255,
+    gamma: float = 1.0,
+    display=None,
+    profile: bool = False,
 ):
-    display = Display(clue._i2c)
+    """Run the animation, on the Scroll pHAT HD unless a display is given.
 
-    speed = 1 / max(frames_per_second, 1)  # Prevent division by zero / negative
+    With ``profile`` each phase is timed, see :mod:`profiler`.
 
-    edge = Edge(width=display.width, height=display.height, side=Edge.top)
+    """
+    table = BrightnessTable(gamma=gamma, level=brightness)
+    if display is None:
+        display = scroll_phat_hd()
+    output = adapt(display, table=table)
+    framebuffer = output.framebuffer
+
+    edge = Edge(width=output.width, height=output.height, side=Edge.top)
 
     wind = Wind(
         edge=edge,
@@ -208,19 +208,55 @@ def main(
 
     petals = [petal_display.bloom()]
 
-    frame = False
+    scheduler = FrameScheduler(frames_per_second)
+
+    if profile:
+        from profiler import Profiler
+
+        profiler = Profiler()
+        while True:
+            profiler.start()
+            framebuffer.fill(0)
+            profiler.mark("clear")
+
+            for petal in petals:
+                petal.draw(framebuffer)
+                petal.decay()
+                petal_display.drop(petal)
+            profiler.mark("draw_decay_drop")
+
+            output.show()
+            profiler.mark("render")
+            first_frame()
+            scheduler.wait()
+            if profiler.poll():
+                print(scheduler.summary())
+
+            profiler.start()
+            petals = [petal for petal in petals if not petal.dead]
+            profiler.mark("clean_petals")
+
+            if more_blooms(chance=bloom_chance):
+                petals.extend(
+                    petal_display.bloom()
+                    for _ in range(random.randint(0, petals_per_bloom_max))
+                )
+            profiler.mark("generate_blooms")
+
+            petal_display.gust(petals)
+            profiler.mark("blow")
 
     while True:
-        display.frame(frame, show=False)
-        display.fill(0)
+        framebuffer.fill(0)
 
         for petal in petals:
-            petal.draw(display)
+            petal.draw(framebuffer)
             petal.decay()
             petal_display.drop(petal)
 
-        display.frame(frame, show=True)
-        sleep(speed)
+        output.show()
+        first_frame()
+        scheduler.wait()
 
         petals = [petal for petal in petals if not petal.dead]
 
@@ -235,5 +271,3 @@ def main(
 
         # if random.random() > 0.9:
         #     edge.side = random.choice([edge.top, edge.bottom, edge.left, edge.right])
-
-        frame = not frame
@@ -0,0 +1,83 @@
+"""Pieces shared by the petal animations."""
+
+import random
+
+
+class Edge:
+    """Side of the display petals bloom on, gravity pulls away from it.
+
+    The pen ranges and the gravity step of the side are worked out when it
+    is set, so blooming and dropping petals allocate nothing:
+
+    - ``x_min``, ``x_max``, ``y_min``, ``y_max``: where petals bloom,
+      inclusive, see :meth:`pixel_pen`.
+    - ``dx``, ``dy``: added to a petal's position when it drops.
+
+    """
+
+    __slots__ = (
+        "width",
+        "height",
+        "_side",
+        "x_min",
+        "x_max",
+        "y_min",
+        "y_max",
+        "dx",
+        "dy",
+    )
+
+    top: int = 0
+    bottom: int = 1
+    left: int = 2
+    right: int = 3
+
+    def __init__(self, width: int, height: int, side: int = top):
+        self.height: int = height
+        self.width: int = width
+        self.side = side
+
+    @property
+    def side(self):
+        return self._side
+
+    @side.setter
+    def side(self, side: int):
+        # The outermost pixels, petals are gone once they leave the display.
+        width = self.width - 1
+        height = self.height - 1
+        self._side: int = side
+        if side == self.top:
+            self.x_min, self.x_max, self.y_min, self.y_max = 0, width, 0, 0
+            self.dx, self.dy = 0, 1
+        elif side == self.bottom:
+            self.x_min, self.x_max, self.y_min, self.y_max = 0, width, height, height
+            self.dx, self.dy = 0, -1
+        elif side == self.left:
+            self.x_min, self.x_max, self.y_min, self.y_max = 0, 0, 0, height
+            self.dx, self.dy = 1, 0
+        else:  # right
+            self.x_min, self.x_max, self.y_min, self.y_max = width, width, 0, height
+            self.dx, self.dy = -1, 0
+
+    def pixel_pen(self):
+        """Return pixel boundaries for selected edge.
+
+        Resulting tuple will be set notation of integers, inclusive.
+
+        - top: x = [0, width - 1], y = [0, 0]
+        - bottom: x = [0, width - 1], y = [height - 1, height - 1]
+        - left: x = [0, 0], y = [0, height - 1]
+        - right: x = [width - 1, width - 1], y = [0, height - 1]
+
+        """
+        return ((self.x_min, self.x_max), (self.y_min, self.y_max))
+
+    def apply_gravity(self, x: int, y: int):
+        """Move pixel according to gravity."""
+        return x + self.dx, y + self.dy
+
+
+def more_blooms(chance: float = 0.0):
+    """Add more petals when :obj:`True`."""
+    return random.random() > chance
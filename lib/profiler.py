@@ -0,0 +1,129 @@
+"""Opt-in timings for the phases of a frame loop.
+
+Loops that support it take a :class:`Profiler` and call :meth:`Profiler.mark`
+after each phase. Each phase keeps its last durations in a fixed ring
+buffer, so a long run does not grow memory. Loops only take the marked path
+when a profiler is given; the normal loop has no hooks in it.
+
+Send any character over the serial console to print the summary, or call
+:meth:`Profiler.report` directly.
+
+"""
+
+import sys
+from array import array
+
+try:
+    from time import ticks_diff, ticks_us
+except ImportError:
+    from time import monotonic_ns
+
+    def ticks_us():
+        return monotonic_ns() // 1000
+
+    def ticks_diff(end: int, start: int):
+        return end - start
+
+
+try:
+    from supervisor import runtime
+
+    def _serial_request():
+        if not runtime.serial_bytes_available:
+            return False
+        sys.stdin.read(runtime.serial_bytes_available)
+        return True
+
+except ImportError:
+    try:
+        import select
+
+        _poll = select.poll()
+        _poll.register(sys.stdin, select.POLLIN)
+
+        def _serial_request():
+            if not _poll.poll(0):
+                return False
+            return bool(sys.stdin.read(1))
+
+    except (ImportError, AttributeError, OSError, ValueError):
+
+        def _serial_request():
+            return False
+
+
+class Timings:
+    """Ring buffer of the last durations of one phase, in microseconds.
+
+    Args:
+        size: Durations kept.
+
+    """
+
+    def __init__(self, size: int = 128):
+        self.samples: array = array("L", [0] * size)
+        self.index: int = 0
+        self.count: int = 0
+
+    def add(self, duration: int):
+        samples = self.samples
+        samples[self.index] = duration
+        self.index = (self.index + 1) % len(samples)
+        if self.count < len(samples):
+            self.count += 1
+
+    def summary(self):
+        """Return ``(minimum, mean, p99)`` of the kept durations."""
+        if not self.count:
+            return 0, 0, 0
+        samples = sorted(self.samples[: self.count])
+        p99 = samples[min(self.count * 99 // 100, self.count - 1)]
+        return samples[0], sum(samples) // self.count, p99
+
+
+class Profiler:
+    """Time named phases of a frame loop.
+
+    Args:
+        size: Durations kept per phase.
+
+    """
+
+    def __init__(self, size: int = 128):
+        self.size: int = size
+        self.phases: dict[str, Timings] = {}
+        self._start: int = ticks_us()
+
+    def start(self):
+        """Start timing the first phase of a frame."""
+        self._start = ticks_us()
+
+    def mark(self, phase: str):
+        """End ``phase`` and start timing the next one."""
+        end = ticks_us()
+        timings = self.phases.get(phase)
+        if timings is None:
+            timings = self.phases[phase] = Timings(self.size)
+        timings.add(ticks_diff(end, self._start))
+        self._start = end
+
+    def report(self):
+        """Return a table of min, mean and p99 microseconds per phase."""
+        lines = ["phase               min_us  mean_us   p99_us"]
+        for phase, timings in self.phases.items():
+            minimum, mean, p99 = timings.summary()
+            name = phase + " " * (18 - len(phase))
+            lines.append(f"{name}{minimum:8d} {mean:8d} {p99:8d}")
+        return "\n".join(lines)
+
+    def poll(self):
+        """Print the report when something was sent over serial.
+
+        Returns:
+            bool: :obj:`True` when the report was printed.
+
+        """
+        if not _serial_request():
+            return False
+        print(self.report())
+        return True
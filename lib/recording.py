@@ -0,0 +1,263 @@
+"""Record animations to a compact file and play them back.
+
+Playing a recording costs a fraction of simulating live, and a recording
+made from a seeded run is the same every time. The file is a header
+followed by one record per frame::
+
+    header  "LGS1", version, width (u16), height (u16), frames per second,
+            0, keyframe interval (u16), frame count (u32), little endian
+    record  kind (u8), payload length (u16), payload
+
+Keyframes (``K``) are run length encoded as ``count, value`` pairs.
+Delta frames (``D``) are ``skip, length, bytes...`` runs against the frame
+before; a run of length zero only skips. The first frame is always a
+keyframe, and so is every frame where that is smaller.
+
+:class:`Player` reads one record at a time into a fixed buffer, so files
+on flash or SD are never loaded whole.
+
+"""
+
+import struct
+
+MAGIC = b"LGS1"
+VERSION = 2  # 1 stored width and height in a byte each.
+HEADER = "<4sBHHBBHI"
+HEADER_SIZE = struct.calcsize(HEADER)
+
+KEYFRAME = 0x4B  # "K"
+DELTA = 0x44  # "D"
+
+
+def _rle(frame):
+    """Return the keyframe payload of ``frame``."""
+    payload = bytearray()
+    index = 0
+    while index < len(frame):
+        value = frame[index]
+        end = index + 1
+        while end < len(frame) and end - index < 255 and frame[end] == value:
+            end += 1
+        payload.append(end - index)
+        payload.append(value)
+        index = end
+    return payload
+
+
+def _delta(frame, previous):
+    """Return the delta payload turning ``previous`` into ``frame``."""
+    payload = bytearray()
+    size = len(frame)
+    index = 0
+    while index < size:
+        start = index
+        while index < size and frame[index] == previous[index]:
+            index += 1
+        if index == size:
+            break
+
+        skip = index - start
+        while skip > 255:
+            payload.append(255)
+            payload.append(0)
+            skip -= 255
+
+        start = index
+        while (
+            index < size and index - start < 255 and frame[index] != previous[index]
+        ):
+            index += 1
+        payload.append(skip)
+        payload.append(index - start)
+        payload.extend(frame[start:index])
+    return payload
+
+
+class Recorder:
+    """Write frames to an open binary file.
+
+    Args:
+        file: File opened for writing in binary mode.
+        width: Pixels per row.
+        height: Number of rows.
+        frames_per_second: Playback rate stored in the header.
+        keyframe_interval: Frames between forced keyframes.
+
+    """
+
+    def __init__(
+        self,
+        file,
+        width: int,
+        height: int,
+        frames_per_second: int = 10,
+        keyframe_interval: int = 50,
+    ):
+        self.file = file
+        self.width: int = width
+        self.height: int = height
+        self.frames_per_second: int = frames_per_second
+        self.keyframe_interval: int = keyframe_interval
+
+        self.frames: int = 0
+        self.bytes_written: int = 0
+        self._previous: bytearray = bytearray(width * height)
+
+        self._write_header()
+
+    def _write_header(self):
+        self.file.write(
+            struct.pack(
+                HEADER,
+                MAGIC,
+                VERSION,
+                self.width,
+                self.height,
+                self.frames_per_second,
+                0,
+                self.keyframe_interval,
+                self.frames,
+            )
+        )
+
+    def add(self, frame):
+        """Append a frame, a buffer of ``width * height`` brightness bytes."""
+        payload = _rle(frame)
+        kind = KEYFRAME
+        if self.frames % self.keyframe_interval:
+            delta = _delta(frame, self._previous)
+            if len(delta) < len(payload):
+                payload = delta
+                kind = DELTA
+
+        self.file.write(struct.pack("<BH", kind, len(payload)))
+        self.file.write(payload)
+        self.bytes_written += 3 + len(payload)
+        self._previous[:] = frame
+        self.frames += 1
+
+    def finish(self):
+        """Store the frame count in the header, the file stays open."""
+        try:
+            self.file.seek(0)
+            self._write_header()
+            self.file.seek(0, 2)
+        except (AttributeError, OSError):
+            pass  # Not seekable, the player reads to the end instead.
+
+    def close(self):
+        """Finish the recording and close the file."""
+        self.finish()
+        self.file.close()
+
+
+class Player:
+    """Decode a recording frame by frame into a frame buffer.
+
+    Args:
+        file: Recording opened for reading in binary mode.
+        framebuffer: :class:`framebuffer.FrameBuffer` of the recording's size.
+
+    """
+
+    def __init__(self, file, framebuffer):
+        self.file = file
+        self.framebuffer = framebuffer
+
+        header = file.read(HEADER_SIZE)
+        (
+            magic,
+            version,
+            self.width,
+            self.height,
+            self.frames_per_second,
+            _,
+            self.keyframe_interval,
+            self.frame_count,
+        ) = struct.unpack(HEADER, header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a recording")
+        if (self.width, self.height) != (framebuffer.width, framebuffer.height):
+            raise ValueError("Recording size does not match the frame buffer")
+
+        # The largest record is a keyframe where no two pixels repeat.
+        self._record: bytearray = bytearray(3)
+        self._payload: bytearray = bytearray(2 * self.width * self.height)
+        self._payload_view: memoryview = memoryview(self._payload)
+
+    def rewind(self):
+        self.file.seek(HEADER_SIZE)
+
+    def next_frame(self):
+        """Decode the next frame into the frame buffer.
+
+        Returns:
+            bool: :obj:`False` at the end of the recording.
+
+        """
+        if self.file.readinto(self._record) != 3:
+            return False
+        kind = self._record[0]
+        length = self._record[1] | self._record[2] << 8
+        if self.file.readinto(self._payload_view[:length]) != length:
+            return False
+
+        payload = self._payload
+        buffer = self.framebuffer.buffer
+        index = 0
+        position = 0
+        if kind == KEYFRAME:
+            while position < length:
+                count = payload[position]
+                value = payload[position + 1]
+                for offset in range(index, index + count):
+                    buffer[offset] = value
+                index += count
+                position += 2
+        else:
+            while position < length:
+                index += payload[position]
+                count = payload[position + 1]
+                position += 2
+                for offset in range(count):
+                    buffer[index + offset] = payload[position + offset]
+                index += count
+                position += count
+        return True
+
+
+def play(
+    path: str,
+    brightness: int = 255,
+    gamma: float = 1.0,
+    display=None,
+    loop: bool = True,
+):
+    """Play a recording, on the Scroll pHAT HD unless a display is given.
+
+    Loops forever by default, any display :func:`displays.adapt` supports
+    will do.
+
+    """
+    from board_init import first_frame
+    from displays import adapt, scroll_phat_hd
+    from lut import BrightnessTable
+    from scheduler import FrameScheduler
+
+    table = BrightnessTable(gamma=gamma, level=brightness)
+    if display is None:
+        display = scroll_phat_hd()
+    output = adapt(display, table=table)
+    with open(path, "rb") as file:
+        player = Player(file, output.framebuffer)
+        scheduler = FrameScheduler(player.frames_per_second)
+        while True:
+            if not player.next_frame():
+                if not loop:
+                    return
+                player.rewind()
+                continue
+
+            output.show()
+            first_frame()
+            scheduler.wait()
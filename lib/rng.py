@@ -0,0 +1,134 @@
+"""Small seedable random numbers for the frame loop.
+
+Chances are compared as integers: :func:`threshold` turns a probability
+into a number in ``[0, 256]`` and a random byte below it is a hit. Hot loops
+take a :meth:`XorShift.batch` of bytes and index it instead of calling a
+function per petal.
+
+Call :func:`seed` for a deterministic run, it seeds :obj:`default` and
+:mod:`random`, and every stream made with :func:`stream` after it.
+
+Every 16 bit xorshift generator walks the same cycle of 65535 states, a
+seed only picks where it starts. :func:`stream` therefore scrambles its
+seeds with :func:`mix`, so streams start far apart instead of one draw
+after each other.
+
+"""
+
+import random
+from array import array
+
+
+GOLDEN = 0x9E37  # Splitmix increment, 2**16 over the golden ratio.
+
+
+def mix(value: int):
+    """Return a well scrambled 16 bit hash of ``value``.
+
+    Nearby values, such as consecutive draws or slot numbers, give
+    unrelated results.
+
+    """
+    value &= 0xFFFF
+    value ^= value >> 8
+    value = (value * 0x88B5) & 0xFFFF
+    value ^= value >> 7
+    value = (value * 0xDB2D) & 0xFFFF
+    value ^= value >> 9
+    return value
+
+
+def threshold(probability: float):
+    """Return the byte threshold hit with ``probability``."""
+    return min(max(int(probability * 256 + 0.5), 0), 256)
+
+
+class XorShift:
+    """16 bit xorshift generator.
+
+    Values stay small integers, so drawing never allocates on CircuitPython,
+    and separate instances, seeded by :func:`stream`, give their own
+    sequences that do not depend on the order they are drawn from.
+
+    Args:
+        seed: Starting state, zero is replaced by one.
+        pool_size: Bytes handed out per batch before the pool grows.
+
+    """
+
+    def __init__(self, seed: int = 1, pool_size: int = 64):
+        self.state: int = 1
+        self.seed(seed)
+
+        self.pool: bytearray = bytearray(pool_size)
+        self.states: array = array("H", [0] * pool_size)
+        self._batch_state: int = self.state
+
+    def seed(self, seed: int):
+        self.state = (seed & 0xFFFF) or 1
+
+    def next(self):
+        """Return the next value in ``[1, 65535]``."""
+        x = self.state
+        x ^= (x << 7) & 0xFFFF
+        x ^= x >> 9
+        x ^= (x << 8) & 0xFFFF
+        self.state = x
+        return x
+
+    def byte(self):
+        """Return the next random byte."""
+        return self.next() >> 8
+
+    def chance(self, hit: int):
+        """Return :obj:`True` with the probability of a :func:`threshold`."""
+        return (self.next() >> 8) < hit
+
+    def randint(self, a: int, b: int):
+        """Return an integer in ``[a, b]``."""
+        return a + self.next() % (b - a + 1)
+
+    def random(self):
+        """Return a float in ``[0, 1)``."""
+        return self.next() / 65536
+
+    def batch(self, count: int):
+        """Draw the next ``count`` bytes into :attr:`pool` and return it.
+
+        The same bytes come out whether they are drawn in one batch, several
+        batches or one :meth:`byte` at a time.
+
+        """
+        if count > len(self.pool):
+            self.pool = bytearray(count)
+            self.states = array("H", [0] * count)
+
+        pool = self.pool
+        states = self.states
+        self._batch_state = x = self.state
+        for index in range(count):
+            x ^= (x << 7) & 0xFFFF
+            x ^= x >> 9
+            x ^= (x << 8) & 0xFFFF
+            states[index] = x
+            pool[index] = x >> 8
+        self.state = x
+        return pool
+
+    def give_back(self, used: int):
+        """Return bytes past the first ``used`` of the last batch to the stream."""
+        self.state = self.states[used - 1] if used else self._batch_state
+
+
+default: XorShift = XorShift()
+
+
+def seed(value: int):
+    """Seed :obj:`default` and :mod:`random` for a deterministic run."""
+    default.seed(value)
+    random.seed(value)
+
+
+def stream(pool_size: int = 64):
+    """Return a new generator seeded from :obj:`default`, see :func:`mix`."""
+    return XorShift(mix(default.next() + GOLDEN), pool_size=pool_size)
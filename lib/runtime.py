@@ -0,0 +1,85 @@
+"""Run rendering, input and transitions as separate asyncio tasks.
+
+Blocking loops tie input to the frame rate: a button is read once per
+frame, and a held button stops the animation. Here every button is polled
+and debounced by its own task, and the render loop paces itself with
+:meth:`scheduler.FrameScheduler.wait_async`, so neither waits for the
+other::
+
+    button = Button(lambda: scroll.is_pressed(scroll.BUTTON_A))
+    run(button.watch(), render())
+
+Tasks share state through the simulation objects and the :class:`Button`
+attributes. On CircuitPython install the ``asyncio`` library from the
+bundle; MicroPython has it built in.
+
+"""
+
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+from scheduler import ticks_diff, ticks_ms
+
+
+class Button:
+    """Debounced state of a button, kept up to date by :meth:`watch`.
+
+    Args:
+        read: Return :obj:`True` while the button is pressed.
+        debounce_ms: How long a new state must hold before it counts.
+        poll_ms: Time between reads.
+
+    Attributes:
+        pressed: Debounced state.
+        presses: Presses since the last :meth:`take_presses`.
+
+    """
+
+    def __init__(self, read, debounce_ms: int = 20, poll_ms: int = 5):
+        self.read = read
+        self.debounce_ms: int = debounce_ms
+        self.poll_ms: int = poll_ms
+
+        self.pressed: bool = False
+        self.presses: int = 0
+        self._changed: int = ticks_ms()
+
+    def held_ms(self):
+        """Return how long the button has been held, zero when released."""
+        if not self.pressed:
+            return 0
+        return ticks_diff(ticks_ms(), self._changed)
+
+    def take_presses(self):
+        """Return the presses since the last call and clear them."""
+        presses = self.presses
+        self.presses = 0
+        return presses
+
+    async def watch(self):
+        """Poll the button forever."""
+        candidate = self.pressed
+        since = ticks_ms()
+        while True:
+            state = bool(self.read())
+            now = ticks_ms()
+            if state != candidate:
+                candidate = state
+                since = now
+            elif state != self.pressed and ticks_diff(now, since) >= self.debounce_ms:
+                self.pressed = state
+                self._changed = now
+                if state:
+                    self.presses += 1
+            await asyncio.sleep(self.poll_ms / 1000)
+
+
+async def _gather(coroutines: tuple):
+    await asyncio.gather(*(asyncio.create_task(coroutine) for coroutine in coroutines))
+
+
+def run(*coroutines):
+    """Run ``coroutines`` as tasks until they all finish."""
+    asyncio.run(_gather(coroutines))
@@ -0,0 +1,148 @@
+"""Pace a frame loop to absolute deadlines.
+
+Sleeping a fixed time after each frame makes the frame period render time
+plus sleep. :class:`FrameScheduler` instead sleeps until the frame's
+deadline, so the period holds while the work per frame changes::
+
+    scheduler = FrameScheduler(frames_per_second=10)
+    while True:
+        render()
+        scheduler.wait()
+
+Time is kept in wrapping millisecond ticks (``time.ticks_ms`` on
+MicroPython, ``supervisor.ticks_ms`` on CircuitPython), so nothing
+allocates a long integer per frame.
+
+"""
+
+from time import sleep
+
+_TICKS_PERIOD = 1 << 29
+_TICKS_MAX = _TICKS_PERIOD - 1
+_TICKS_HALF = _TICKS_PERIOD // 2
+
+try:
+    from time import ticks_add, ticks_diff, ticks_ms
+except ImportError:
+    try:
+        from supervisor import ticks_ms
+    except ImportError:
+        from time import monotonic_ns
+
+        def ticks_ms():
+            return (monotonic_ns() // 1_000_000) & _TICKS_MAX
+
+    def ticks_add(ticks: int, delta: int):
+        return (ticks + delta) % _TICKS_PERIOD
+
+    def ticks_diff(end: int, start: int):
+        return ((end - start + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+
+
+class FrameScheduler:
+    """Sleep out the rest of each frame's time budget.
+
+    When a frame overruns its deadline the missed frames are skipped, not
+    caught up, and the schedule restarts from the late frame.
+
+    Args:
+        frames_per_second: Target frame rate, at least one.
+
+    Attributes:
+        frames: Frames waited for.
+        overruns: Frames that finished after their deadline.
+        skipped: Frame slots dropped by overruns.
+        worst_ms: Longest time from one :meth:`wait` returning to the next
+            being called.
+        jitter_ms: Largest difference between a frame period and the
+            target period.
+
+    """
+
+    def __init__(self, frames_per_second: int = 10):
+        # Prevent division by zero / negative
+        self.frames_per_second: int = max(frames_per_second, 1)
+        self.period_ms: int = 1000 // self.frames_per_second
+
+        self.frames: int = 0
+        self.overruns: int = 0
+        self.skipped: int = 0
+        self.worst_ms: int = 0
+        self.jitter_ms: int = 0
+        self.jitter_total_ms: int = 0
+        self.last_skipped: int = 0
+
+        self.reset()
+
+    def reset(self):
+        """Restart the schedule from now, e.g. after a pause."""
+        self._start: int = ticks_ms()
+        self._slot: int = 0
+        self._woke: int = self._start
+
+    def _deadline(self, slot: int):
+        return ticks_add(self._start, slot * 1000 // self.frames_per_second)
+
+    def _budget(self):
+        """Count a finished frame, return milliseconds left until the next."""
+        now = ticks_ms()
+        busy = ticks_diff(now, self._woke)
+        if busy > self.worst_ms:
+            self.worst_ms = busy
+
+        self._slot += 1
+        late = ticks_diff(now, self._deadline(self._slot))
+        if self._slot == self.frames_per_second:
+            # Rebase every second so the slot stays a small integer.
+            self._start = ticks_add(self._start, 1000)
+            self._slot = 0
+
+        self.last_skipped = 0
+        if late <= 0:
+            return -late
+
+        self.overruns += 1
+        self.last_skipped = late * self.frames_per_second // 1000
+        self.skipped += self.last_skipped
+        self._start = now
+        self._slot = 0
+        return 0
+
+    def _woken(self):
+        woke = ticks_ms()
+        jitter = abs(ticks_diff(woke, self._woke) - self.period_ms)
+        if jitter > self.jitter_ms:
+            self.jitter_ms = jitter
+        self.jitter_total_ms += jitter
+        self._woke = woke
+        self.frames += 1
+        return self.last_skipped
+
+    def wait(self):
+        """Sleep until the next frame is due.
+
+        Returns:
+            int: Frame slots skipped because this frame was late, usually
+            zero.
+
+        """
+        budget = self._budget()
+        if budget:
+            sleep(budget / 1000)
+        return self._woken()
+
+    async def wait_async(self):
+        """Like :meth:`wait`, but lets other asyncio tasks run meanwhile."""
+        from runtime import asyncio
+
+        await asyncio.sleep(self._budget() / 1000)
+        return self._woken()
+
+    def summary(self):
+        """Return the counters as one line of text."""
+        mean_jitter = self.jitter_total_ms // self.frames if self.frames else 0
+        return (
+            f"frames={self.frames} overruns={self.overruns}"
+            f" skipped={self.skipped} worst_ms={self.worst_ms}"
+            f" jitter_ms={self.jitter_ms} mean_jitter_ms={mean_jitter}"
+        )
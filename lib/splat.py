@@ -0,0 +1,58 @@
+"""Draw a petal at a sub-pixel position, using integers only.
+
+Positions are 8.8 fixed point: the pixel in the high bits and the fraction
+in the low byte. :func:`splat` spreads a petal over the four pixels around
+it, weighted by how close it is to each, and keeps the larger of each
+weight (0-255) and what the frame buffer already holds, wrapping at the
+edges. Overlapping petals then show the brightest, whatever the order they
+are drawn in.
+
+On MicroPython the ``@micropython.viper`` version from ``_splat_viper`` is
+used when it is available.
+
+"""
+
+ONE = 256  # 1.0 in 8.8 fixed point.
+
+
+def to_fixed(value: float):
+    """Return ``value`` in 8.8 fixed point."""
+    return int(value * ONE)
+
+
+def splat(buffer, width: int, height: int, x: int, y: int):
+    """Blend the four weights of a petal at fixed point ``(x, y)`` by maximum."""
+    column = x >> 8
+    row = y >> 8
+    x_fraction = x & 255
+    y_fraction = y & 255
+
+    right = column + 1
+    if right >= width:
+        right = 0
+    below = row + 1
+    if below >= height:
+        below = 0
+    top = row * width
+    bottom = below * width
+
+    weight = ((256 - x_fraction) * (256 - y_fraction)) >> 8
+    if weight > 255:
+        weight = 255
+    if weight > buffer[top + column]:
+        buffer[top + column] = weight
+    weight = (x_fraction * (256 - y_fraction)) >> 8
+    if weight > buffer[top + right]:
+        buffer[top + right] = weight
+    weight = ((256 - x_fraction) * y_fraction) >> 8
+    if weight > buffer[bottom + column]:
+        buffer[bottom + column] = weight
+    weight = (x_fraction * y_fraction) >> 8
+    if weight > buffer[bottom + right]:
+        buffer[bottom + right] = weight
+
+
+try:
+    from _splat_viper import splat  # noqa: F811
+except (ImportError, SyntaxError):
+    pass
@@ -0,0 +1,89 @@
+"""One bit images stored as a bitmask per row.
+
+Write sprites as binary literals so the source still looks like the image,
+the leftmost digit being column 0::
+
+    HEART = Sprite(17, (
+        0b00000001010000000,
+        0b00000011111000000,
+    ))
+
+:meth:`Sprite.from_pattern` compiles a grid of ``0``/``1`` characters at
+runtime and :meth:`Sprite.source` prints the literal to paste in instead.
+
+"""
+
+
+class Sprite:
+    """Rows of lit pixels, drawn with :meth:`blit`.
+
+    Args:
+        width: Columns per row.
+        rows: One integer per row, bit ``width - 1`` is column 0.
+
+    """
+
+    def __init__(self, width: int, rows: tuple):
+        self.width: int = width
+        self.rows: tuple = tuple(rows)
+        self.height: int = len(self.rows)
+        self.runs: tuple = self._runs()
+
+    @classmethod
+    def from_pattern(cls, pattern: str):
+        """Compile a grid of ``0``/``1`` characters."""
+        lines = pattern.split()
+        width = max(len(line) for line in lines)
+        return cls(
+            width, tuple(int(line + "0" * (width - len(line)), 2) for line in lines)
+        )
+
+    def source(self):
+        """Return Python source that rebuilds this sprite."""
+        rows = ""
+        for row in self.rows:
+            bits = bin(row)[2:]
+            rows += "    0b" + "0" * (self.width - len(bits)) + bits + ",\n"
+        return f"Sprite({self.width}, (\n{rows}))"
+
+    def _runs(self):
+        """Return ``(row, start, end)`` for every horizontal run of lit pixels."""
+        runs = []
+        for row, mask in enumerate(self.rows):
+            column = 0
+            while column < self.width:
+                if not mask >> (self.width - 1 - column) & 1:
+                    column += 1
+                    continue
+                start = column
+                while column < self.width and mask >> (self.width - 1 - column) & 1:
+                    column += 1
+                runs.append((row, start, column))
+        return tuple(runs)
+
+    def lit(self, x: int, y: int):
+        """Return :obj:`True` when the pixel is set."""
+        return bool(self.rows[y] >> (self.width - 1 - x) & 1)
+
+    def blit(self, framebuffer, color: int, x: int = 0, y: int = 0):
+        """Set the sprite's lit pixels to ``color``, leaving the rest alone.
+
+        Args:
+            framebuffer: :class:`framebuffer.FrameBuffer` to draw into.
+            color: Brightness of lit pixels.
+            x: Column of the sprite's left edge.
+            y: Row of the sprite's top edge.
+
+        """
+        width = framebuffer.width
+        height = framebuffer.height
+        buffer = framebuffer.buffer
+        for row, start, end in self.runs:
+            row += y
+            if not 0 <= row < height:
+                continue
+            start = max(start + x, 0)
+            end = min(end + x, width)
+            base = row * width
+            for index in range(base + start, base + end):
+                buffer[index] = color
@@ -5,16 +5,48 @@
 
 """
 
-import math
 import random
-import time
+from array import array
 
-from picoscroll import HEIGHT, WIDTH, PicoScroll
+import rng
+from board_init import first_frame
+from displays import PicoScrollDisplay
+from lut import BrightnessTable
+from scheduler import FrameScheduler, ticks_add, ticks_diff, ticks_ms
+from splat import ONE, splat, to_fixed
 
-scroll = PicoScroll()
+DRIFT_HIT = rng.threshold(0.1)
+DRIFTS_MAX = 8  # Drifts a dropping petal keeps queued.
 
 
 class Petal:
+    """Petal moving at sub-pixel steps.
+
+    Positions are 8.8 fixed point (see :mod:`splat`), so moving and drawing
+    a petal needs no float maths.
+
+    """
+
+    __slots__ = (
+        "x",
+        "y",
+        "max_width",
+        "max_height",
+        "steps_per_interval",
+        "x_limit",
+        "y_limit",
+        "drop_direction_x",
+        "drop_direction_y",
+        "drop_increment",
+        "x_velocity",
+        "y_velocity",
+        "frames_left",
+        "drift_steps",
+        "drift_frames",
+        "drift_first",
+        "pending_drifts",
+    )
+
     def __init__(
         self,
         x: float,
@@ -25,176 +57,242 @@ class Petal:
         drop_direction_x: int = 0,
         drop_direction_y: int = 1,
     ):
-        self.x: float = x
-        self.y: float = y
+        self.x: int = to_fixed(x)
+        self.y: int = to_fixed(y)
         self.max_width: int = max_width
         self.max_height: int = max_height
         self.steps_per_interval: int = steps_per_interval
 
+        self.x_limit: int = max_width * ONE
+        self.y_limit: int = max_height * ONE
+
         self.drop_direction_x: int = drop_direction_x
         self.drop_direction_y: int = drop_direction_y
-        self.drop_increment: float = random.random() / self.steps_per_interval
-
-        self.x_drops: list[float] = []
-        self.y_drops: list[float] = []
-
-        self.x_steps: list[float] = []
-        self.y_steps: list[float] = []
-
-    def grid(self):
-        """Return grid of points to draw.
-
-        1 0
-        0 0
-
-        """
-        x_dec, x = math.modf(self.x)
-        y_dec, y = math.modf(self.y)
-        x, y = int(x), int(y)
-
-        top_left = (
-            x % self.max_width,
-            y % self.max_height,
-            ((1 - x_dec) * (1 - y_dec)),
-        )
-        top_right = (
-            (x + 1) % self.max_width,
-            y % self.max_height,
-            (x_dec * (1 - y_dec)),
-        )
-
-        bottom_left = (
-            x % self.max_width,
-            (y + 1) % self.max_height,
-            ((1 - x_dec) * y_dec),
-        )
-        bottom_right = (
-            (x + 1) % self.max_width,
-            (y + 1) % self.max_height,
-            (x_dec * y_dec),
-        )
-
-        return (top_left, top_right, bottom_left, bottom_right)
+        self.drop_increment: int = to_fixed(random.random()) // self.steps_per_interval
+
+        # Motion is a velocity held for a number of frames. Drifts wait in a
+        # small ring, oldest first, until the current motion is done.
+        self.x_velocity: int = 0
+        self.y_velocity: int = 0
+        self.frames_left: int = 0
+        self.drift_steps: array = array("h", [0] * DRIFTS_MAX)
+        self.drift_frames: bytearray = bytearray(DRIFTS_MAX)
+        self.drift_first: int = 0
+        self.pending_drifts: int = 0
 
     def step_size(self):
-        step = random.randrange(-10, 10) / 10
-        return step / self.steps_per_interval
+        # Round the magnitude, floor division would round every negative
+        # step down and the petals would drift towards -x and -y.
+        step = rng.default.randint(-10, 9) * ONE
+        divisor = 10 * self.steps_per_interval
+        if step < 0:
+            return -((divisor // 2 - step) // divisor)
+        return (step + divisor // 2) // divisor
 
     def walk(self):
-        if not self.x_steps:
-            self.x_steps = [self.step_size()] * self.steps_per_interval
-        if not self.y_steps:
-            self.y_steps = [self.step_size()] * self.steps_per_interval
-
-        self.x = (self.x + self.x_steps.pop()) % self.max_width
-        self.y = (self.y + self.y_steps.pop()) % self.max_height
-        return self.x, self.y
+        if not self.frames_left:
+            self.x_velocity = self.step_size()
+            self.y_velocity = self.step_size()
+            self.frames_left = self.steps_per_interval
+
+        self.frames_left -= 1
+        self.x = (self.x + self.x_velocity) % self.x_limit
+        self.y = (self.y + self.y_velocity) % self.y_limit
+
+    def queue_drift(self, step: int, frames: int):
+        pending = self.pending_drifts
+        if pending == DRIFTS_MAX:
+            # Full, the newest drift lasts longer instead.
+            last = (self.drift_first + pending - 1) % DRIFTS_MAX
+            self.drift_frames[last] = min(self.drift_frames[last] + frames, 255)
+            return
+
+        slot = (self.drift_first + pending) % DRIFTS_MAX
+        self.drift_steps[slot] = step
+        self.drift_frames[slot] = frames
+        self.pending_drifts = pending + 1
 
     def drop(self):
-        if not self.x_drops:
-            self.x_drops = [
-                self.drop_direction_x * self.drop_increment
-            ] * self.steps_per_interval
-        if not self.y_drops:
-            self.y_drops = [
-                self.drop_direction_y * self.drop_increment
-            ] * self.steps_per_interval
+        if not self.frames_left:
+            if self.pending_drifts:
+                first = self.drift_first
+                self.x_velocity = self.drift_steps[first]
+                self.y_velocity = 0
+                self.frames_left = self.drift_frames[first]
+                self.drift_first = (first + 1) % DRIFTS_MAX
+                self.pending_drifts -= 1
+            else:
+                self.x_velocity = self.drop_direction_x * self.drop_increment
+                self.y_velocity = self.drop_direction_y * self.drop_increment
+                self.frames_left = self.steps_per_interval
 
         # drift
-        if random.random() < 0.1:
-            # self.x_drops.pop()
-            drift_frames = random.randrange(5)
-            self.x_drops = [self.step_size()] * drift_frames + self.x_drops
-            self.y_drops = [0] * drift_frames + self.y_drops
-            # return
-
-        self.x = (self.x + self.x_drops.pop()) % self.max_width
-        self.y = (self.y + self.y_drops.pop()) % self.max_height
-        return self.x, self.y
-
-button_held_x = 1
-button_held_y = 1
-
-max_bright = 7
-
-steps_per_interval = 15
-sleep_time = 1 / steps_per_interval
-num_of_petals = 10
-
-petals = [
-    Petal(
-        random.randrange(WIDTH),
-        random.randrange(HEIGHT),
-        max_width=WIDTH,
-        max_height=HEIGHT,
-        steps_per_interval=steps_per_interval,
-    )
-    for _ in range(num_of_petals)
-]
-
-while True:
-    for step in range(steps_per_interval):
-        # A: Add a petal
-        while scroll.is_pressed(scroll.BUTTON_A):
-            petal = Petal(
-                random.randrange(WIDTH),
-                random.randrange(HEIGHT),
-                max_width=WIDTH,
-                max_height=HEIGHT,
-                steps_per_interval=steps_per_interval,
-            )
-            petals.append(petal)
-
-            scroll.clear()
-            scroll.show_text(f"{len(petals)}P", max_bright, 0)
-            scroll.show()
-            time.sleep(0.2)
-
-        # B: Remove a petal
-        while scroll.is_pressed(scroll.BUTTON_B):
-            if petals:
-                petals.pop(0)
-
-            scroll.clear()
-            scroll.show_text(f"{len(petals)}P", max_bright, 0)
-            scroll.show()
-            time.sleep(0.2)
-
-        # X: Brighter
-        if scroll.is_pressed(scroll.BUTTON_X):
-            max_bright = min(max_bright + button_held_x, 255)
-            button_held_x = min(button_held_x + 1, 255)
-            if max_bright >= 255:
-                scroll.clear()
-                scroll.show_text("MAX", 255, 0)
-                scroll.show()
-                time.sleep(0.5)
-        else:
-            button_held_x = 1
-
-        # Y: Dimmer
-        if scroll.is_pressed(scroll.BUTTON_Y):
-            max_bright = max(max_bright - button_held_y, 0)
-            button_held_y = min(button_held_y + 1, 255)
-        else:
-            button_held_y = 1
-
-        scroll.clear()
+        if rng.default.chance(DRIFT_HIT):
+            drift_frames = rng.default.randint(0, 4)
+            step = self.step_size()
+            if drift_frames:
+                self.queue_drift(step, drift_frames)
+
+        self.frames_left -= 1
+        self.x = (self.x + self.x_velocity) % self.x_limit
+        self.y = (self.y + self.y_velocity) % self.y_limit
+
+
+async def animate(scroll, button_a, button_b, button_x, button_y, profile=False):
+    """Animate the petals while the buttons are handled in their own task.
+
+    Args:
+        scroll: Pico Scroll, or one of the same shape.
+        button_a: :class:`runtime.Button` adding petals.
+        button_b: :class:`runtime.Button` removing petals.
+        button_x: :class:`runtime.Button` for brighter.
+        button_y: :class:`runtime.Button` for dimmer.
+        profile: Time each phase, see :mod:`profiler`.
+
+    """
+    from runtime import asyncio
+
+    width = scroll.get_width()
+    height = scroll.get_height()
+
+    max_bright = 7
+    table = BrightnessTable(gamma=1.0, level=max_bright)
+
+    output = PicoScrollDisplay(scroll, table=table)
+    framebuffer = output.framebuffer
+    buffer = framebuffer.buffer
+
+    steps_per_interval = 15
+    scheduler = FrameScheduler(steps_per_interval)
+    num_of_petals = 10
+
+    def new_petal():
+        return Petal(
+            random.randrange(width),
+            random.randrange(height),
+            max_width=width,
+            max_height=height,
+            steps_per_interval=steps_per_interval,
+        )
 
-        for petal in petals:
-            points = petal.grid()
-            for x, y, brightness in points:
-                if not brightness:
-                    continue
+    petals = [new_petal() for _ in range(num_of_petals)]
 
-                try:
-                    scroll.set_pixel(x, y, math.floor(max_bright * brightness))
-                except ValueError as error:
-                    print(x, y, brightness)
-                    raise error
+    # Text stays up until this tick, the petals keep moving behind it.
+    text_until = ticks_ms()
 
+    def show_text(text: str, brightness: int, duration_ms: int):
+        nonlocal text_until
+        scroll.clear()
+        scroll.show_text(text, brightness, 0)
         scroll.show()
-        time.sleep(sleep_time)
+        text_until = ticks_add(ticks_ms(), duration_ms)
+
+    async def count_petals():
+        while True:
+            # A: Add a petal
+            if button_a.pressed:
+                petals.append(new_petal())
+            # B: Remove a petal
+            elif button_b.pressed:
+                if petals:
+                    petals.pop(0)
+            else:
+                await asyncio.sleep(0.01)
+                continue
+
+            show_text(f"{len(petals)}P", max_bright, 200)
+            await asyncio.sleep(0.2)
+
+    async def render():
+        nonlocal max_bright
+        button_held_x = 1
+        button_held_y = 1
+
+        profiler = None
+        if profile:
+            from profiler import Profiler
+
+            profiler = Profiler()
+
+        while True:
+            if profiler is not None:
+                profiler.start()
+
+            # X: Brighter
+            if button_x.pressed:
+                max_bright = min(max_bright + button_held_x, 255)
+                button_held_x = min(button_held_x + 1, 255)
+                if max_bright >= 255:
+                    show_text("MAX", 255, 500)
+            else:
+                button_held_x = 1
+
+            # Y: Dimmer
+            if button_y.pressed:
+                max_bright = max(max_bright - button_held_y, 0)
+                button_held_y = min(button_held_y + 1, 255)
+            else:
+                button_held_y = 1
+
+            # Only rebuilt when X or Y changed the level.
+            table.set_level(max_bright)
+            if profiler is not None:
+                profiler.mark("buttons")
+
+            if ticks_diff(text_until, ticks_ms()) <= 0:
+                framebuffer.fill(0)
+
+                for petal in petals:
+                    splat(buffer, width, height, petal.x, petal.y)
+                if profiler is not None:
+                    profiler.mark("splat")
+
+                output.show()
+                if profiler is not None:
+                    profiler.mark("show")
+                first_frame()
+
+            await scheduler.wait_async()
+            if profiler is not None:
+                if profiler.poll():
+                    print(scheduler.summary())
+                profiler.start()
+
+            for petal in petals:
+                petal.walk()
+            if profiler is not None:
+                profiler.mark("walk")
+
+    await asyncio.gather(count_petals(), render())
+
+
+def main(scroll=None, profile: bool = False):
+    """Run the petals, on the Pico Scroll unless a scroll is given.
+
+    With ``profile`` each phase is timed, see :mod:`profiler`.
+
+    """
+    from runtime import Button, run
+
+    if scroll is None:
+        from picoscroll import PicoScroll
+
+        scroll = PicoScroll()
+
+    buttons = [
+        Button(lambda button=button: scroll.is_pressed(button))
+        for button in (
+            scroll.BUTTON_A,
+            scroll.BUTTON_B,
+            scroll.BUTTON_X,
+            scroll.BUTTON_Y,
+        )
+    ]
+    run(
+        *(button.watch() for button in buttons),
+        animate(scroll, *buttons, profile=profile),
+    )
+
 
-        for petal in petals:
-            petal.walk()
+if __name__ == "__main__":
+    main()
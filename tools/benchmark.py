@@ -0,0 +1,383 @@
+"""Benchmark the petal simulations headless on the host.
+
+Runs each scenario for a number of frames with fixed seeds over a grid of
+parameters and reports frames per second, time per phase, peak live petals
+and bytes allocated per frame. Results are written as JSON so runs can be
+compared over time::
+
+    python tools/benchmark.py --frames 500 --seeds 1 2 3 \\
+        --grid bloom_chance=0.1,0.3,0.6 --grid num_of_layers=1,3 \\
+        --output bench.json
+
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "lib"))
+sys.path.insert(0, ROOT)
+
+import layeredpetalbit  # noqa: E402
+import petalbit  # noqa: E402
+import pico_scroll_petals  # noqa: E402
+import rng  # noqa: E402
+from displays import IS31Display, PicoScrollDisplay  # noqa: E402
+from headless import HeadlessDisplay, HeadlessPicoScroll  # noqa: E402
+from lut import BrightnessTable  # noqa: E402
+from splat import splat  # noqa: E402
+
+now = time.perf_counter_ns
+
+
+class Phases:
+    """Accumulate nanoseconds per named phase."""
+
+    def __init__(self):
+        self.totals: dict[str, int] = {}
+        self._start: int = 0
+
+    def start(self):
+        self._start = now()
+
+    def stop(self, phase: str):
+        end = now()
+        self.totals[phase] = self.totals.get(phase, 0) + end - self._start
+        self._start = end
+
+
+class NoPhases(Phases):
+    """Phase timer that does nothing, used while measuring allocations."""
+
+    def start(self):
+        pass
+
+    def stop(self, phase: str):
+        pass
+
+
+def layered(params: dict):
+    """Build a ``layeredpetalbit`` frame step, returns ``(step, live_petals)``.
+
+    Runs the fused :meth:`Layer.tick` unless the ``fused`` parameter is false,
+    then each phase is timed on its own. ``vectorized`` runs
+    :class:`arraylayer.ArrayLayer` instead, which needs NumPy. ``blend``
+    picks a :mod:`composite` mode to blend the layers in.
+
+    """
+    layer_class = layeredpetalbit.Layer
+    if params.get("vectorized", False):
+        from arraylayer import ArrayLayer
+
+        layer_class = ArrayLayer
+
+    display = HeadlessDisplay()
+    edge = layeredpetalbit.Edge(
+        width=display.width, height=display.height, side=layeredpetalbit.Edge.top
+    )
+    wind = layeredpetalbit.Wind(
+        edge=edge,
+        gust_chance=params.get("gust_chance", 0.7),
+        gust_duration_max=params.get("gust_duration_max", 10),
+        gust_miss_chance=params.get("gust_miss_chance", 0.3),
+        gust_strength_max=params.get("gust_strength_max", 3),
+    )
+    petal_display = layeredpetalbit.LayeredPetalDisplay(
+        edge,
+        wind,
+        bloom_chance=params.get("bloom_chance", 0.3),
+        brightness_min=10,
+        brightness_max=200,
+        num_of_layers=params.get("num_of_layers", 3),
+        petal_capacity=params.get("petal_capacity", 64),
+        petals_per_bloom_max=params.get("petals_per_bloom_max", 2),
+        layer_class=layer_class,
+        blend=params.get("blend"),
+    )
+    petal_display.create_layers()
+
+    output = IS31Display(display)
+    framebuffer = output.framebuffer
+    layers = petal_display.layers
+    fused = params.get("fused", True)
+
+    def step(phases: Phases):
+        phases.start()
+        framebuffer.fill(0)
+        target = petal_display.target(framebuffer)
+        phases.stop("clear")
+        for layer in layers:
+            if fused:
+                layer.tick(target, gust=layer is layers[0])
+                phases.stop("tick")
+                continue
+            layer.draw(target)
+            phases.stop("draw")
+            layer.decay()
+            phases.stop("decay")
+            layer.drop()
+            phases.stop("drop")
+            layer.clean_petals()
+            phases.stop("clean_petals")
+            layer.generate_blooms()
+            phases.stop("generate_blooms")
+            if layer is layers[0]:
+                layer.gust()
+                phases.stop("gust")
+        if target is not framebuffer:
+            target.resolve(framebuffer)
+            phases.stop("resolve")
+        output.show()
+        phases.stop("render")
+
+    def live_petals():
+        return sum(layer.count for layer in layers)
+
+    return step, live_petals
+
+
+def petals(params: dict):
+    """Build a ``petalbit`` frame step, returns ``(step, live_petals)``."""
+    display = HeadlessDisplay()
+    edge = petalbit.Edge(
+        width=display.width, height=display.height, side=petalbit.Edge.top
+    )
+    wind = petalbit.Wind(
+        edge=edge,
+        gust_chance=params.get("gust_chance", 0.2),
+        gust_duration_max=params.get("gust_duration_max", 5),
+        gust_miss_chance=params.get("gust_miss_chance", 0.4),
+        gust_strength_max=params.get("gust_strength_max", 2),
+    )
+    petal_display = petalbit.PetalDisplay(
+        edge=edge,
+        petal_brightness_max=200,
+        petal_brightness_min=50,
+        petal_decay_rate_max=20,
+        petal_drift_chance=0.8,
+        wind=wind,
+    )
+    bloom_chance = params.get("bloom_chance", 0.3)
+    petals_per_bloom_max = params.get("petals_per_bloom_max", 3)
+
+    output = IS31Display(display)
+    framebuffer = output.framebuffer
+    state = {"petals": [petal_display.bloom()]}
+
+    def step(phases: Phases):
+        phases.start()
+        framebuffer.fill(0)
+        phases.stop("clear")
+        for petal in state["petals"]:
+            petal.draw(framebuffer)
+            petal.decay()
+            petal_display.drop(petal)
+        phases.stop("draw_decay_drop")
+        output.show()
+        phases.stop("render")
+        state["petals"] = [petal for petal in state["petals"] if not petal.dead]
+        phases.stop("clean_petals")
+        if petalbit.more_blooms(chance=bloom_chance):
+            state["petals"].extend(
+                petal_display.bloom()
+                for _ in range(random.randint(0, petals_per_bloom_max))
+            )
+        phases.stop("generate_blooms")
+        petal_display.gust(state["petals"])
+        phases.stop("gust")
+
+    def live_petals():
+        return len(state["petals"])
+
+    return step, live_petals
+
+
+def pico(params: dict):
+    """Build a ``pico_scroll_petals`` frame step, returns ``(step, live_petals)``."""
+    scroll = HeadlessPicoScroll()
+    width = scroll.get_width()
+    height = scroll.get_height()
+    steps_per_interval = params.get("steps_per_interval", 15)
+    table = BrightnessTable(gamma=1.0, level=params.get("max_bright", 7))
+    use_drop = params.get("drop", False)
+    output = PicoScrollDisplay(scroll, table=table)
+    framebuffer = output.framebuffer
+    buffer = framebuffer.buffer
+
+    petals = [
+        pico_scroll_petals.Petal(
+            random.randrange(width),
+            random.randrange(height),
+            max_width=width,
+            max_height=height,
+            steps_per_interval=steps_per_interval,
+        )
+        for _ in range(params.get("num_of_petals", 10))
+    ]
+
+    def step(phases: Phases):
+        phases.start()
+        framebuffer.fill(0)
+        phases.stop("clear")
+        for petal in petals:
+            splat(buffer, width, height, petal.x, petal.y)
+        phases.stop("splat")
+        output.show()
+        phases.stop("render")
+        for petal in petals:
+            if use_drop:
+                petal.drop()
+            else:
+                petal.walk()
+        phases.stop("drop" if use_drop else "walk")
+
+    def live_petals():
+        return len(petals)
+
+    return step, live_petals
+
+
+SCENARIOS = {
+    "layered": layered,
+    "petalbit": petals,
+    "pico": pico,
+}
+
+
+def run(scenario: str, params: dict, seed: int, frames: int, warmup: int):
+    """Time one scenario run, then repeat it to measure allocations."""
+    rng.seed(seed)
+    step, live_petals = SCENARIOS[scenario](params)
+    phases = Phases()
+    peak_petals = 0
+
+    for _ in range(warmup):
+        step(NoPhases())
+
+    start = now()
+    for _ in range(frames):
+        step(phases)
+        peak_petals = max(peak_petals, live_petals())
+    elapsed = now() - start
+
+    return {
+        "scenario": scenario,
+        "params": params,
+        "seed": seed,
+        "frames": frames,
+        "frames_per_second": frames / (elapsed / 1e9) if elapsed else None,
+        "phase_us_per_frame": {
+            phase: total / frames / 1e3 for phase, total in phases.totals.items()
+        },
+        "peak_live_petals": peak_petals,
+        "allocated_bytes_per_frame": allocated_per_frame(
+            scenario, params, seed, frames, warmup
+        ),
+    }
+
+
+def allocated_per_frame(
+    scenario: str, params: dict, seed: int, frames: int, warmup: int
+):
+    """Return the bytes a scenario allocates per frame, freed or not."""
+    rng.seed(seed)
+    step, _ = SCENARIOS[scenario](params)
+    for _ in range(warmup):
+        step(NoPhases())
+
+    no_phases = NoPhases()
+    allocated = 0
+    tracemalloc.start()
+    for _ in range(frames):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        step(no_phases)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - current
+    tracemalloc.stop()
+    return allocated / frames
+
+
+def _value(raw: str):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def parse_grid(items: list[str]):
+    """Turn ``name=v1,v2`` strings into a list of parameter dicts.
+
+    Values are read as JSON, anything else stays a string, so
+    ``blend=max,add`` needs no quotes.
+
+    """
+    names = []
+    values = []
+    for item in items:
+        name, _, raw = item.partition("=")
+        names.append(name)
+        values.append([_value(value) for value in raw.split(",")])
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run, repeat for several (default: all).",
+    )
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1])
+    parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2",
+        help="Parameter values to sweep, repeat for several parameters.",
+    )
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scenario in args.scenario or sorted(SCENARIOS):
+        for params in parse_grid(args.grid):
+            for seed in args.seeds:
+                result = run(scenario, params, seed, args.frames, args.warmup)
+                results.append(result)
+                print(
+                    f"{scenario:9} seed={seed} {json.dumps(params)}"
+                    f" fps={result['frames_per_second']:.0f}"
+                    f" peak_petals={result['peak_live_petals']}"
+                    f" alloc_bytes/frame={result['allocated_bytes_per_frame']:.0f}"
+                )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(
+                {
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_implementation()
+                    + " "
+                    + platform.python_version(),
+                    "results": results,
+                },
+                output,
+                indent=2,
+            )
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
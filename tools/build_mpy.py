@@ -0,0 +1,108 @@
+"""Precompile the modules to ``.mpy`` bytecode with ``mpy-cross``.
+
+The board then loads bytecode instead of compiling every module from source
+at boot, which saves the compile time and its heap spike::
+
+    python tools/build_mpy.py circuitpython --mpy-cross ~/bin/mpy-cross-cp9
+    python tools/build_mpy.py micropython --march armv6m
+
+Each ``.mpy`` only loads on firmware with the same bytecode version, so use
+the ``mpy-cross`` released with the firmware on the board. Copy
+``build/<target>/mpy`` to the root of the board: ``code.py`` puts ``/mpy``
+in front of ``sys.path`` when it exists, the sources in ``/lib`` stay as
+the fallback.
+
+CircuitPython has no viper emitter, so ``_splat_viper`` is left out and
+:mod:`splat` keeps its pure Python version. On MicroPython it is only
+compiled for a given ``--march``.
+
+"""
+
+import argparse
+import os
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that only make sense on the host.
+HOST_ONLY = {"headless.py"}
+
+TARGETS = {
+    "circuitpython": {"sources": ["lib"], "exclude": {"_splat_viper.py"}},
+    "micropython": {"sources": ["lib", "pico_scroll_petals.py"], "exclude": set()},
+}
+
+NATIVE = {"_splat_viper.py"}
+
+
+def sources(target: str):
+    """Return the source paths to compile for ``target``, relative to the root."""
+    exclude = TARGETS[target]["exclude"] | HOST_ONLY
+    paths = []
+    for source in TARGETS[target]["sources"]:
+        if source.endswith(".py"):
+            paths.append(source)
+            continue
+        for name in sorted(os.listdir(os.path.join(ROOT, source))):
+            if name.endswith(".py") and name not in exclude:
+                paths.append(os.path.join(source, name))
+    return paths
+
+
+def build(
+    target: str,
+    output_dir: str,
+    mpy_cross: str = "mpy-cross",
+    march: str = None,
+    optimize: int = 0,
+):
+    """Compile every module of ``target`` into ``output_dir``.
+
+    Returns:
+        list: ``(source, mpy path)`` of the compiled modules.
+
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    built = []
+    for source in sources(target):
+        name = os.path.basename(source)
+        command = [mpy_cross, f"-O{optimize}"]
+        if name in NATIVE:
+            if march is None:
+                print(f"skip {source}: native code needs --march")
+                continue
+            command.append(f"-march={march}")
+
+        output = os.path.join(output_dir, name[:-3] + ".mpy")
+        command += ["-o", output, "-s", name, os.path.join(ROOT, source)]
+        subprocess.run(command, check=True)
+        built.append((source, output))
+    return built
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("target", choices=sorted(TARGETS))
+    parser.add_argument("--mpy-cross", default="mpy-cross")
+    parser.add_argument(
+        "--march", default=None, help="Architecture for native code, e.g. armv6m."
+    )
+    parser.add_argument("-O", "--optimize", type=int, default=0)
+    parser.add_argument("--output-dir", default=None)
+    args = parser.parse_args(argv)
+
+    output_dir = args.output_dir or os.path.join(ROOT, "build", args.target, "mpy")
+    built = build(args.target, output_dir, args.mpy_cross, args.march, args.optimize)
+
+    source_bytes = sum(
+        os.path.getsize(os.path.join(ROOT, source)) for source, _ in built
+    )
+    mpy_bytes = sum(os.path.getsize(output) for _, output in built)
+    print(
+        f"{len(built)} modules in {output_dir}:"
+        f" {source_bytes} bytes of source, {mpy_bytes} bytes of bytecode"
+    )
+
+
+if __name__ == "__main__":
+    main()
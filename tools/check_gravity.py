@@ -0,0 +1,88 @@
+"""Check that petals leave the display at every gravity angle.
+
+Runs :func:`layeredpetalbit.create` with a :class:`field.VectorField` for a
+range of gravity angles and fails when a live petal strays further from the
+display than one frame's drop and gust can take it, which is what petals
+that are never culled do::
+
+    python tools/check_gravity.py --frames 3000 --step 15
+
+Per angle it prints the live petals and lit pixels per frame on average.
+
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "lib"))
+sys.path.insert(0, ROOT)
+
+import layeredpetalbit  # noqa: E402
+import rng  # noqa: E402
+from framebuffer import FrameBuffer  # noqa: E402
+from headless import HEIGHT, WIDTH  # noqa: E402
+
+
+def strays(layers, width: int, height: int, margin: int):
+    """Return the number of live petals more than ``margin`` off the display."""
+    found = 0
+    for layer in layers:
+        for index in range(layer.count):
+            x = layer.x[index]
+            y = layer.y[index]
+            if not (-margin <= x < width + margin and -margin <= y < height + margin):
+                found += 1
+    return found
+
+
+def check(angle: float, frames: int, seed: int, margin: int):
+    """Run ``frames`` frames at gravity ``angle``.
+
+    Returns:
+        tuple: ``(stray petals, live petals per frame, lit pixels per frame)``.
+
+    """
+    rng.seed(seed)
+    petal_display = layeredpetalbit.create(WIDTH, HEIGHT, gravity_angle=angle)
+    framebuffer = FrameBuffer(WIDTH, HEIGHT)
+    layers = petal_display.layers
+
+    found = live = lit = 0
+    for _ in range(frames):
+        framebuffer.fill(0)
+        petal_display.draw(framebuffer)
+        found += strays(layers, WIDTH, HEIGHT, margin)
+        live += sum(layer.count for layer in layers)
+        lit += sum(1 for value in framebuffer.buffer if value)
+    return found, live / frames, lit / frames
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--step", type=int, default=15, help="Degrees per angle.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--margin",
+        type=int,
+        default=8,
+        help="Pixels off the display a petal may be before the next frame.",
+    )
+    args = parser.parse_args(argv)
+
+    failed = []
+    for angle in range(0, 360, args.step):
+        found, live, lit = check(angle, args.frames, args.seed, args.margin)
+        print(f"{angle:3} degrees: {live:5.1f} petals {lit:5.1f} lit", end="")
+        print(f" {found} stray" if found else "")
+        if found:
+            failed.append(angle)
+
+    if failed:
+        raise SystemExit(f"Petals strayed at {failed} degrees")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Measure memory per simulation object and allocations per frame on the host.
+
+Objects are created a thousand at a time under :mod:`tracemalloc` and the
+bytes they hold are averaged, objects they share, like the edge of a wind,
+are created beforehand and not counted. ``slots`` tells whether instances
+went without a ``__dict__``. Allocations per frame come from the scenarios
+of :mod:`benchmark`::
+
+    python tools/memory_benchmark.py --frames 300 --output memory.json
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "lib"))
+sys.path.insert(0, ROOT)
+
+import layeredpetalbit  # noqa: E402
+import petalbit  # noqa: E402
+import pico_scroll_petals  # noqa: E402
+from benchmark import SCENARIOS, allocated_per_frame  # noqa: E402
+from headless import HEIGHT, WIDTH  # noqa: E402
+from petals import Edge  # noqa: E402
+
+
+def objects():
+    """Return ``{name: factory}`` of the objects to measure."""
+    edge = Edge(WIDTH, HEIGHT)
+    petalbit_wind = petalbit.Wind(edge)
+    layered_wind = layeredpetalbit.Wind(edge)
+    return {
+        "Edge": lambda: Edge(WIDTH, HEIGHT),
+        "petalbit.Petal": lambda: petalbit.Petal(3, 4, 200, 10),
+        "petalbit.Wind": lambda: petalbit.Wind(edge),
+        "petalbit.PetalDisplay": lambda: petalbit.PetalDisplay(edge, petalbit_wind),
+        "layeredpetalbit.Wind": lambda: layeredpetalbit.Wind(edge),
+        "layeredpetalbit.Layer": lambda: layeredpetalbit.Layer(edge, layered_wind),
+        "layeredpetalbit.LayeredPetalDisplay": lambda: (
+            layeredpetalbit.LayeredPetalDisplay(edge, layered_wind)
+        ),
+        "pico_scroll_petals.Petal": lambda: pico_scroll_petals.Petal(
+            3, 4, max_width=WIDTH, max_height=HEIGHT, steps_per_interval=15
+        ),
+    }
+
+
+def bytes_per_object(factory, count: int = 1000):
+    """Return the average bytes held by one object from ``factory``."""
+    instances = [None] * count
+    factory()  # Warm up caches outside the measurement.
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for index in range(count):
+        instances[index] = factory()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / count, not hasattr(instances[0], "__dict__")
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    per_object = {}
+    for name, factory in objects().items():
+        size, slots = bytes_per_object(factory, args.count)
+        per_object[name] = {"bytes": size, "slots": slots}
+        print(f"{name:36} {size:8.0f} B {'slots' if slots else 'dict'}")
+
+    per_frame = {}
+    for scenario in sorted(SCENARIOS):
+        per_frame[scenario] = allocated_per_frame(
+            scenario, {}, args.seed, args.frames, args.warmup
+        )
+        print(f"{scenario:36} {per_frame[scenario]:8.0f} B/frame")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(
+                {
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_implementation()
+                    + " "
+                    + platform.python_version(),
+                    "bytes_per_object": per_object,
+                    "allocated_bytes_per_frame": per_frame,
+                },
+                output,
+                indent=2,
+            )
+    return per_object, per_frame
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Record an animation headless into a stream for :func:`recording.play`.
+
+The layered petals are simulated from a seed, so the same arguments give
+the same file byte for byte::
+
+    python tools/record.py layered --frames 600 --seed 7 \\
+        --param bloom_chance=0.5 --output petals.lgs
+    python tools/record.py wave --output wave.lgs
+
+Copy the file to the board and call ``recording.play("petals.lgs")``.
+
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "lib"))
+
+import heartbit  # noqa: E402
+import layeredpetalbit  # noqa: E402
+import rng  # noqa: E402
+from framebuffer import FrameBuffer  # noqa: E402
+from headless import HEIGHT, WIDTH, HeadlessDisplay  # noqa: E402
+from recording import Player, Recorder  # noqa: E402
+
+now = time.perf_counter_ns
+
+
+def layered_frames(frames: int, seed: int, params: dict):
+    """Yield ``(frame, nanoseconds to simulate it)`` of a seeded layered run."""
+    rng.seed(seed)
+    layered_petal_display = layeredpetalbit.create(WIDTH, HEIGHT, **params)
+    framebuffer = FrameBuffer(WIDTH, HEIGHT)
+    for _ in range(frames):
+        start = now()
+        framebuffer.fill(0)
+        layered_petal_display.draw(framebuffer)
+        yield framebuffer.buffer, now() - start
+
+
+def wave_frames(frames: int, seed: int, params: dict):
+    """Yield the frames of ``heartbit.wave``, looped up to ``frames``."""
+    start = now()
+    animation = heartbit.wave_animation(HeadlessDisplay(), **params)
+    elapsed = (now() - start) // len(animation.frames)
+    for index in range(frames or len(animation.frames)):
+        yield animation.frames[index % len(animation.frames)], elapsed
+
+
+ANIMATIONS = {
+    "layered": layered_frames,
+    "wave": wave_frames,
+}
+
+
+def record(animation: str, file, frames: int, seed: int, params: dict, **options):
+    """Record to ``file``, returns nanoseconds spent simulating."""
+    recorder = Recorder(file, WIDTH, HEIGHT, **options)
+    simulated = 0
+    for frame, elapsed in ANIMATIONS[animation](frames, seed, params):
+        recorder.add(frame)
+        simulated += elapsed
+    return recorder, simulated
+
+
+def decode_time(data: bytes):
+    """Return ``(frames, nanoseconds)`` to decode a whole recording."""
+    player = Player(io.BytesIO(data), FrameBuffer(WIDTH, HEIGHT))
+    frames = 0
+    start = now()
+    while player.next_frame():
+        frames += 1
+    return frames, now() - start
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("animation", choices=sorted(ANIMATIONS))
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--frames-per-second", type=int, default=10)
+    parser.add_argument("--keyframe-interval", type=int, default=50)
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Animation parameter, repeat for several.",
+    )
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args(argv)
+
+    params = {}
+    for item in args.param:
+        name, _, value = item.partition("=")
+        params[name] = json.loads(value)
+
+    buffer = io.BytesIO()
+    recorder, simulated = record(
+        args.animation,
+        buffer,
+        args.frames,
+        args.seed,
+        params,
+        frames_per_second=args.frames_per_second,
+        keyframe_interval=args.keyframe_interval,
+    )
+    recorder.finish()
+    data = buffer.getvalue()
+
+    with open(args.output, "wb") as output:
+        output.write(data)
+
+    frames, decoded = decode_time(data)
+    print(
+        f"{args.output}: {frames} frames, {len(data)} bytes"
+        f" ({len(data) / max(frames, 1):.1f} bytes/frame),"
+        f" simulate {simulated / max(frames, 1) / 1e3:.1f} us/frame,"
+        f" play {decoded / max(frames, 1) / 1e3:.1f} us/frame"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Compare import time and heap of source modules against ``.mpy`` bytecode.
+
+Runs the unix port of MicroPython, one fresh process per run, importing the
+animations once from the sources and once from bytecode built by
+:mod:`build_mpy` with the same ``mpy-cross`` version::
+
+    python tools/startup_benchmark.py --runs 5 --heapsize 192k \\
+        --micropython micropython/ports/unix/build-standard/micropython
+
+Per mode it prints the median import time, the heap in use right after the
+imports (``peak``, compile garbage included, so keep the heap large enough
+not to collect during the imports) and what stays in use after a collection.
+``--heapsize`` close to the CLUE's free heap shows which mode runs out.
+:mod:`heartbit` needs CircuitPython's ``time.monotonic`` and is left out.
+
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from build_mpy import build  # noqa: E402
+
+MODULES = ("layeredpetalbit", "petalbit", "pico_scroll_petals")
+
+# Run by MicroPython, prints import microseconds, peak and retained bytes.
+DRIVER = """\
+import gc
+import sys
+import time
+
+sys.path[:0] = {paths!r}
+gc.collect()
+before = gc.mem_alloc()
+start = time.ticks_us()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.ticks_diff(time.ticks_us(), start)
+peak = gc.mem_alloc() - before
+gc.collect()
+print(elapsed, peak, gc.mem_alloc() - before)
+"""
+
+
+def measure(micropython: str, paths: list, modules: tuple, heapsize: str):
+    """Import ``modules`` in a fresh MicroPython.
+
+    Returns:
+        dict: ``import_us``, ``peak_bytes`` and ``retained_bytes``, or
+        ``error`` when the run failed, e.g. with a MemoryError.
+
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as driver:
+        driver.write(DRIVER.format(paths=paths, modules=modules))
+    try:
+        result = subprocess.run(
+            [micropython, "-X", f"heapsize={heapsize}", driver.name],
+            capture_output=True,
+            text=True,
+        )
+    finally:
+        os.remove(driver.name)
+
+    if result.returncode:
+        lines = (result.stderr or result.stdout).strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit {result.returncode}"}
+    import_us, peak, retained = (int(value) for value in result.stdout.split()[-3:])
+    return {"import_us": import_us, "peak_bytes": peak, "retained_bytes": retained}
+
+
+def median(values: list):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--micropython", default="micropython")
+    parser.add_argument("--mpy-cross", default="mpy-cross")
+    parser.add_argument("--march", default=None, help="e.g. x64 for the unix port.")
+    parser.add_argument("--modules", nargs="+", default=list(MODULES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--heapsize", default="2M")
+    parser.add_argument("--output", default=None, help="Write results as JSON.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as build_dir:
+        build("micropython", build_dir, args.mpy_cross, args.march)
+        modes = {
+            "source": [os.path.join(ROOT, "lib"), ROOT],
+            "mpy": [build_dir],
+        }
+
+        results = {}
+        for mode, paths in modes.items():
+            runs = [
+                measure(args.micropython, paths, tuple(args.modules), args.heapsize)
+                for _ in range(args.runs)
+            ]
+            errors = [run["error"] for run in runs if "error" in run]
+            if errors:
+                results[mode] = {"error": errors[0]}
+                print(f"{mode:6} failed: {errors[0]}")
+                continue
+
+            results[mode] = {
+                key: median([run[key] for run in runs])
+                for key in ("import_us", "peak_bytes", "retained_bytes")
+            }
+            print(
+                f"{mode:6} import={results[mode]['import_us'] / 1e3:.1f}ms"
+                f" peak={results[mode]['peak_bytes']}B"
+                f" retained={results[mode]['retained_bytes']}B"
+            )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(
+                {
+                    "modules": args.modules,
+                    "heapsize": args.heapsize,
+                    "results": results,
+                },
+                output,
+                indent=2,
+            )
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Render parameter sweeps of the layered petals on the host.
+
+Every combination of ``--grid`` values and ``--seeds`` is simulated headless
+in a process pool. Each run writes the chosen outputs to its own directory,
+named after its parameters and seed:
+
+- ``sheet``: contact sheet PNG of evenly spaced frames
+- ``gif``: the whole run as an animated GIF
+- ``stream``: a recording for :func:`recording.play`
+
+and ``summary.json`` collects the metrics of all runs: mean lit pixels,
+petal population per frame and simulation time per frame::
+
+    python tools/sweep.py --frames 300 --seeds 1 2 \\
+        --grid bloom_chance=0.2,0.5 --grid gust_strength_max=1,3 \\
+        --outputs sheet gif --output-dir sweep
+
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "lib"))
+
+import layeredpetalbit  # noqa: E402
+import rng  # noqa: E402
+from benchmark import parse_grid  # noqa: E402
+from framebuffer import FrameBuffer  # noqa: E402
+from headless import HEIGHT, WIDTH, write_gif, write_png  # noqa: E402
+from recording import Recorder  # noqa: E402
+
+OUTPUTS = ("sheet", "gif", "stream")
+
+now = time.perf_counter_ns
+
+
+def run_name(params: dict, seed: int):
+    """Return a directory name for one run."""
+    parts = [f"{name}={value}" for name, value in sorted(params.items())]
+    return "_".join(parts + [f"seed={seed}"])
+
+
+def contact_sheet(frames: list, width: int, height: int, columns: int, gap: int = 1):
+    """Tile frames into one image, returns ``(pixels, width, height)``."""
+    rows = -(-len(frames) // columns)
+    sheet_width = columns * (width + gap) - gap
+    sheet_height = rows * (height + gap) - gap
+    pixels = bytearray(sheet_width * sheet_height)
+    for number, frame in enumerate(frames):
+        left = (number % columns) * (width + gap)
+        top = (number // columns) * (height + gap)
+        for y in range(height):
+            start = (top + y) * sheet_width + left
+            pixels[start : start + width] = frame[y * width : (y + 1) * width]
+    return pixels, sheet_width, sheet_height
+
+
+def run(job: dict):
+    """Simulate one parameter set and seed, write its outputs, return metrics."""
+    params = job["params"]
+    seed = job["seed"]
+    directory = os.path.join(job["output_dir"], run_name(params, seed))
+    os.makedirs(directory, exist_ok=True)
+
+    rng.seed(seed)
+    layered_petal_display = layeredpetalbit.create(WIDTH, HEIGHT, **params)
+    framebuffer = FrameBuffer(WIDTH, HEIGHT)
+
+    frames = []
+    population = []
+    lit_pixels = 0
+    simulated = 0
+    for _ in range(job["frames"]):
+        start = now()
+        framebuffer.fill(0)
+        layered_petal_display.draw(framebuffer)
+        simulated += now() - start
+
+        frame = bytes(framebuffer.buffer)
+        frames.append(frame)
+        lit_pixels += sum(1 for value in frame if value)
+        population.append(sum(layer.count for layer in layered_petal_display.layers))
+
+    files = []
+    if "sheet" in job["outputs"]:
+        step = max(len(frames) // job["sheet_frames"], 1)
+        pixels, width, height = contact_sheet(frames[::step], WIDTH, HEIGHT, 8)
+        path = os.path.join(directory, "sheet.png")
+        write_png(path, pixels, width, height, scale=job["scale"])
+        files.append(path)
+    if "gif" in job["outputs"]:
+        path = os.path.join(directory, "run.gif")
+        write_gif(path, frames, WIDTH, HEIGHT, job["scale"], 1000 // job["fps"])
+        files.append(path)
+    if "stream" in job["outputs"]:
+        path = os.path.join(directory, "run.lgs")
+        recorder = Recorder(open(path, "wb"), WIDTH, HEIGHT, job["fps"])
+        for frame in frames:
+            recorder.add(frame)
+        recorder.close()
+        files.append(path)
+
+    count = max(len(frames), 1)
+    return {
+        "params": params,
+        "seed": seed,
+        "frames": len(frames),
+        "mean_lit_pixels": lit_pixels / count,
+        "mean_population": sum(population) / count,
+        "peak_population": max(population, default=0),
+        "population": population,
+        "simulate_us_per_frame": simulated / count / 1e3,
+        "files": files,
+    }
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1])
+    parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2",
+        help="layeredpetalbit.create() values to sweep, repeat for several.",
+    )
+    parser.add_argument("--outputs", nargs="*", choices=OUTPUTS, default=["sheet"])
+    parser.add_argument("--output-dir", default="sweep")
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--scale", type=int, default=4)
+    parser.add_argument("--sheet-frames", type=int, default=32)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Processes (default: CPUs)."
+    )
+    args = parser.parse_args(argv)
+
+    jobs = [
+        {
+            "params": params,
+            "seed": seed,
+            "frames": args.frames,
+            "outputs": args.outputs,
+            "output_dir": args.output_dir,
+            "fps": args.fps,
+            "scale": args.scale,
+            "sheet_frames": args.sheet_frames,
+        }
+        for params in parse_grid(args.grid)
+        for seed in args.seeds
+    ]
+
+    with multiprocessing.Pool(args.workers) as pool:
+        results = []
+        for result in pool.imap(run, jobs):
+            results.append(result)
+            print(
+                f"{run_name(result['params'], result['seed'])}:"
+                f" lit={result['mean_lit_pixels']:.1f}"
+                f" petals={result['mean_population']:.1f}"
+                f" peak={result['peak_population']}"
+                f" sim_us/frame={result['simulate_us_per_frame']:.0f}"
+            )
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    with open(os.path.join(args.output_dir, "summary.json"), "w") as output:
+        json.dump(
+            {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results},
+            output,
+            indent=2,
+        )
+    return results
+
+
+if __name__ == "__main__":
+    main()